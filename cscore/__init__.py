@@ -13,10 +13,13 @@ from ._cscore import (
     ImageSource,
     MjpegServer,
     RawEvent,
+    RawSink,
+    RawSource,
     UsbCamera,
     UsbCameraInfo,
     VideoCamera,
     VideoEvent,
+    VideoEventPoller,
     VideoListener,
     VideoMode,
     VideoProperty,
@@ -37,10 +40,13 @@ __all__ = [
     "ImageSource",
     "MjpegServer",
     "RawEvent",
+    "RawSink",
+    "RawSource",
     "UsbCamera",
     "UsbCameraInfo",
     "VideoCamera",
     "VideoEvent",
+    "VideoEventPoller",
     "VideoListener",
     "VideoMode",
     "VideoProperty",
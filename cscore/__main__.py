@@ -29,7 +29,22 @@ def _parent_poll_thread() -> None:
     stopMainRunLoop()
 
 
-def _run_user_thread(vision_py: str, vision_fn: str) -> None:
+def _start_replay(source) -> None:
+    # only the process() shims tell the source when they are done with a frame
+    if source.lockstep:
+        logger.warning("--replay-lockstep requires an object with a process function")
+        source.lockstep = False
+    source.start()
+
+
+def _run_user_thread(
+    vision_py: str,
+    vision_fn: str,
+    workers: int = 1,
+    worker_type: str = "thread",
+    track_latency: bool = False,
+    source=None,
+) -> None:
     vision_pymod = splitext(basename(vision_py))[0]
 
     logger.info("Loading %s (%s)", vision_py, vision_fn)
@@ -48,11 +63,40 @@ def _run_user_thread(vision_py: str, vision_fn: str) -> None:
         if hasattr(obj, "process"):
             logger.info("-> Detected GRIP-compatible object")
 
-            from . import grip
+            if workers > 1:
+                from . import parallel
 
-            grip.run(obj)
+                parallel.run(
+                    obj,
+                    workers,
+                    processes=worker_type == "process",
+                    track_latency=track_latency,
+                    source=source,
+                )
+            else:
+                from . import grip
+
+                grip.run(obj, track_latency=track_latency, source=source)
         else:
-            # otherwise just call it
+            if workers > 1:
+                logger.warning(
+                    "--workers ignored, %s has no 'process' function", vision_fn
+                )
+            if track_latency:
+                logger.warning(
+                    "--latency ignored, %s has no 'process' function. Use"
+                    " cscore.latency.LatencyTracker to measure it yourself",
+                    vision_fn,
+                )
+
+            # otherwise just call it. A replay source is started first, so
+            # that it is the source used by CameraServer.getVideo()
+            if source is not None:
+                from ._cscore import CameraServer
+
+                CameraServer.startAutomaticCapture(source)
+                _start_replay(source)
+
             obj()
 
     except Exception:
@@ -92,6 +136,52 @@ def main():
     parser.add_argument(
         "--nt-identity", default="cscore", help="NetworkTables identity"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of workers to run a pipeline's per-frame 'process' function on",
+    )
+    parser.add_argument(
+        "--worker-type",
+        choices=["thread", "process"],
+        default="thread",
+        help="Run workers in threads or in separate processes",
+    )
+    parser.add_argument(
+        "--latency",
+        action="store_true",
+        default=False,
+        help="Publish frame latency percentiles to NetworkTables",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="Play back an ImageWriter session or video file instead of"
+        " using a camera",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        help="Replay speed relative to the recorded timing, 0 for max speed",
+    )
+    parser.add_argument(
+        "--replay-lockstep",
+        action="store_true",
+        default=False,
+        help="Wait for each replayed frame to be processed before playing"
+        " the next one",
+    )
+    parser.add_argument(
+        "--camera-cache",
+        metavar="PATH",
+        nargs="?",
+        const="",
+        help="Apply cached camera configuration at startup, and update the"
+        " cache once the camera connects. If PATH is not specified, a"
+        " default location is used",
+    )
     parser.add_argument(
         "vision_py",
         nargs="?",
@@ -129,11 +219,32 @@ def main():
         t = threading.Thread(target=_parent_poll_thread, name="lifetime", daemon=True)
         t.start()
 
+    source = None
+    if args.replay:
+        from .replay import ReplaySource
+
+        source = ReplaySource(
+            args.replay,
+            speed=args.replay_speed or None,
+            lockstep=args.replay_lockstep,
+        )
+
     # If no python file specified, then just start the automatic capture
     if args.vision_py is None:
         from ._cscore import CameraServer
 
-        CameraServer.startAutomaticCapture()
+        if source is None and args.camera_cache is not None:
+            from . import cameracache
+
+            cache = cameracache.CameraCache(
+                args.camera_cache or cameracache.DEFAULT_PATH
+            )
+            cameracache.startAutomaticCapture(cache=cache)
+        elif source is None:
+            CameraServer.startAutomaticCapture()
+        else:
+            CameraServer.startAutomaticCapture(source)
+            _start_replay(source)
     else:
         s = args.vision_py.split(":", 1)
         vision_py = abspath(s[0])
@@ -141,7 +252,14 @@ def main():
 
         thread = threading.Thread(
             target=_run_user_thread,
-            args=(vision_py, vision_fn),
+            args=(
+                vision_py,
+                vision_fn,
+                args.workers,
+                args.worker_type,
+                args.latency,
+                source,
+            ),
             name="vision",
             daemon=True,
         )
@@ -1,12 +1,111 @@
 import logging
+import threading
+import time
 import typing
 
-from ._cscore import _setLogger
+from ._cscore import _drainLogQueue, _setQueuedLogger
 
+_thread = None
+_limiter = None
+_lock = threading.Lock()
+
+
+class _RateLimiter:
+    """Token bucket per logging site (file, line)"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        # site -> [tokens, last update, suppressed]
+        self.sites = {}
+
+    def allow(self, site, count: int, now: float) -> typing.Tuple[bool, int]:
+        """
+        :returns: whether to log a message from site, and how many messages
+                  from that site were suppressed before it
+        """
+        state = self.sites.get(site)
+        if state is None:
+            state = self.sites[site] = [float(self.burst), now, 0]
+
+        tokens = min(self.burst, state[0] + (now - state[1]) * self.rate)
+        state[1] = now
+
+        if tokens < 1:
+            state[0] = tokens
+            state[2] += count
+            return False, 0
+
+        state[0] = tokens - 1
+        suppressed = state[2]
+        state[2] = 0
+        return True, suppressed
+
+
+def _drain_thread(logger: logging.Logger):
+    while True:
+        records, dropped = _drainLogQueue(0.25)
+        now = time.monotonic()
+        limiter = _limiter
+
+        for lvl, file, line, msg, count in records:
+            suppressed = 0
+            if limiter is not None:
+                allowed, suppressed = limiter.allow((file, line), count, now)
+                if not allowed:
+                    continue
+                # the first message of this batch is logged, the rest counted
+                suppressed += count - 1
+            elif count > 1:
+                suppressed = count - 1
+
+            if suppressed:
+                logger.log(lvl, "%s (repeated %d times)", msg, suppressed + 1)
+            else:
+                logger.log(lvl, msg)
+
+        if dropped:
+            logger.warning("%d cscore log messages dropped", dropped)
+
+
+def enableLogging(
+    level: typing.Optional[int] = None,
+    *,
+    rate_limit: typing.Optional[float] = 5.0,
+    burst: int = 10,
+):
+    """
+    Enable logging for cscore
+
+    Messages are queued by cscore and logged from a separate thread, so
+    cscore never waits for the GIL to log. Repeated messages are collapsed.
+
+    :param level:      Minimum level of messages to log
+    :param rate_limit: Maximum sustained messages per second logged from
+                       each location in the cscore source, or None for no
+                       limit. Suppressed messages are counted and reported
+                       with the next message that is logged.
+    :param burst:      Number of messages from a single location that may
+                       be logged at once before the rate limit applies
+    """
+    global _thread, _limiter
 
-def enableLogging(level: typing.Optional[int] = None):
-    """Enable logging for cscore"""
     if level is None:
         level = logging.DEBUG
     logger = logging.getLogger("cscore")
-    _setLogger(lambda lvl, file, line, msg: logger.log(lvl, msg), level)
+
+    _limiter = None
+    if rate_limit is not None:
+        _limiter = _RateLimiter(rate_limit, burst)
+
+    _setQueuedLogger(level)
+
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(
+                target=_drain_thread,
+                args=(logger,),
+                name="cscore-log",
+                daemon=True,
+            )
+            _thread.start()
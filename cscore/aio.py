@@ -0,0 +1,105 @@
+"""
+asyncio support for receiving frames from a :class:`.CvSink`.
+
+cscore does not provide a way to be notified of new frames without blocking
+a thread, so each pending grab occupies an executor thread while it waits.
+The wait happens with the GIL released, so many cameras can be serviced by
+a single event loop without managing per-sink threads yourself. Give the
+sinks an executor with a thread for each of them, see :class:`AsyncCvSink`::
+
+    async def process(sink, executor):
+        async for t, img in AsyncCvSink(sink, executor=executor).frames():
+            ...
+
+    async def main():
+        sinks = [sink1, sink2]
+        with concurrent.futures.ThreadPoolExecutor(len(sinks)) as executor:
+            await asyncio.gather(*(process(s, executor) for s in sinks))
+
+    asyncio.run(main())
+"""
+
+import asyncio
+import concurrent.futures
+import typing
+
+import numpy as np
+
+from ._cscore import CvSink
+
+
+class AsyncCvSink:
+    """
+    Wraps a :class:`.CvSink` so that frames can be awaited from an asyncio
+    event loop.
+
+    .. warning:: Each pending grab occupies an executor thread for up to
+                 the grab timeout. The default executor of the event loop
+                 has a limited number of threads, which are also used by
+                 ``run_in_executor`` and by name resolution. With more
+                 sinks than free threads, cameras delay each other and
+                 everything else that uses the default executor. When
+                 grabbing from more than a couple of sinks, pass an
+                 executor with one thread per sink.
+    """
+
+    def __init__(
+        self,
+        sink: CvSink,
+        *,
+        executor: typing.Optional[concurrent.futures.Executor] = None
+    ):
+        """
+        :param sink:     Sink to grab frames from
+        :param executor: Executor to wait for frames in, which may be
+                         shared between sinks if it has a thread for each.
+                         If not specified, the default executor of the
+                         event loop is used.
+        """
+        self.sink = sink
+        self.executor = executor
+
+    async def grab(
+        self, image: typing.Optional[np.ndarray] = None, timeout: float = 0.225
+    ) -> typing.Tuple[int, np.ndarray]:
+        """
+        Waits for the next frame. See :meth:`.CvSink.grabFrameInto`.
+
+        .. warning:: If the awaiting task is cancelled, the grab continues in
+                     the background until it completes or times out, and
+                     may still write into ``image``.
+
+        :param image:   Preallocated array to store the frame in. If not
+                        specified, a new array is allocated.
+        :param timeout: Retrieval timeout in seconds
+
+        :returns: Tuple of frame time (or 0 on error) and the image
+        """
+        if image is None:
+            image = np.empty((0, 0, 3), dtype=np.uint8)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self.sink.grabFrameInto, image, timeout
+        )
+
+    async def frames(
+        self, image: typing.Optional[np.ndarray] = None, timeout: float = 0.225
+    ) -> typing.AsyncIterator[typing.Tuple[int, np.ndarray]]:
+        """
+        Asynchronously iterates over frames from the sink. Frames that fail
+        to be retrieved are skipped, call :meth:`.CvSink.getError` to find
+        out why.
+
+        The same buffer is reused for every frame, so each frame must be
+        processed (or copied) before the next iteration.
+
+        :param image:   Preallocated array to store frames in
+        :param timeout: Retrieval timeout in seconds
+
+        :returns: async iterator of (frame time, image)
+        """
+        while True:
+            t, image = await self.grab(image, timeout)
+            if t != 0:
+                yield t, image
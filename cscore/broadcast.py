@@ -0,0 +1,182 @@
+import threading
+import typing
+
+import numpy as np
+
+import logging
+
+from ._cscore import CvSink, VideoSource
+from .encodecache import EncodeCache
+
+logger = logging.getLogger("cscore.broadcast")
+
+
+class FrameSubscriber:
+    """
+    Receives frames from a :class:`FrameBroadcaster`. Only the most recent
+    frame is kept, so a subscriber that falls behind skips frames instead
+    of building up a backlog.
+    """
+
+    def __init__(self, broadcaster: "FrameBroadcaster"):
+        self._broadcaster = broadcaster
+        self._seq = 0
+
+    def get(
+        self, timeout: typing.Optional[float] = None
+    ) -> typing.Tuple[int, typing.Optional[np.ndarray]]:
+        """
+        Waits for a frame newer than the last one this subscriber received.
+
+        The returned image is read-only and shared with every other
+        subscriber. Copy it if you need to modify it.
+
+        :param timeout: Seconds to wait, or None to wait forever
+
+        :returns: Tuple of frame time and image, or (0, None) on timeout or
+                  if the broadcaster was stopped
+        """
+        b = self._broadcaster
+        with b._cond:
+            if not b._cond.wait_for(
+                lambda: b._seq != self._seq or not b._running, timeout
+            ):
+                return 0, None
+            if b._seq == self._seq:
+                return 0, None
+
+            self._seq = b._seq
+            return b._time, b._image
+
+    def getEncoded(
+        self,
+        quality: int = 80,
+        width: typing.Optional[int] = None,
+        height: typing.Optional[int] = None,
+        timeout: typing.Optional[float] = None,
+    ) -> typing.Tuple[int, typing.Optional[np.ndarray]]:
+        """
+        Same as :meth:`get`, but returns the frame JPEG encoded. Subscribers
+        that request the same frame with the same settings share a single
+        encode, see :attr:`FrameBroadcaster.encodeCache`.
+
+        :param quality: JPEG quality (0-100)
+        :param width:   Width to resize to, or None for the original size
+        :param height:  Height to resize to, or None for the original size
+        :param timeout: Seconds to wait, or None to wait forever
+
+        :returns: Tuple of frame time and read-only encoded image, or
+                  (0, None) on timeout or if the broadcaster was stopped
+        """
+        t, img = self.get(timeout)
+        if img is None:
+            return 0, None
+        b = self._broadcaster
+        return t, b.encodeCache.encode(
+            b.source, t, img, quality=quality, width=width, height=height
+        )
+
+    def poll(self) -> typing.Tuple[int, typing.Optional[np.ndarray]]:
+        """
+        Returns the latest frame if it hasn't been received by this
+        subscriber yet, otherwise (0, None). Does not block.
+        """
+        return self.get(0)
+
+    def close(self) -> None:
+        """Stops receiving frames"""
+        self._broadcaster._unsubscribe(self)
+
+
+class FrameBroadcaster:
+    """
+    Decodes frames from a source once and shares them between any number
+    of subscribers. Attaching several :class:`.CvSink` objects to the same
+    camera decodes and copies every frame once per sink; the broadcaster
+    uses a single sink and hands out the same read-only array instead.
+
+    Intended usage is::
+
+        broadcaster = FrameBroadcaster(camera)
+
+        # in each consumer thread
+        sub = broadcaster.subscribe()
+        while True:
+            time, img = sub.get()
+            if img is None:
+                break
+            ..
+    """
+
+    def __init__(
+        self, source: VideoSource, *, name: str = "broadcast", timeout: float = 0.225
+    ):
+        """
+        :param source:  Source to receive frames from
+        :param name:    Name of the sink created for the source
+        :param timeout: Frame retrieval timeout in seconds
+        """
+        self.source = source
+        self.sink = CvSink(name)
+        self.sink.setSource(source)
+        self.timeout = timeout
+
+        #: :class:`.EncodeCache` used by :meth:`FrameSubscriber.getEncoded`
+        self.encodeCache = EncodeCache()
+
+        self._cond = threading.Condition()
+        self._subscribers = []
+        self._seq = 0
+        self._time = 0
+        self._image = None
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def subscribe(self) -> FrameSubscriber:
+        """Creates a new subscriber that receives frames from now on"""
+        sub = FrameSubscriber(self)
+        with self._cond:
+            sub._seq = self._seq
+            self._subscribers.append(sub)
+        return sub
+
+    @property
+    def subscribers(self) -> int:
+        """Number of active subscribers"""
+        with self._cond:
+            return len(self._subscribers)
+
+    def stop(self) -> None:
+        """Stops the broadcast thread and wakes up all subscribers"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _unsubscribe(self, sub: FrameSubscriber) -> None:
+        with self._cond:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def _run(self):
+        empty = np.empty((0, 0, 3), dtype=np.uint8)
+
+        while self._running:
+            # Each frame gets its own buffer so that subscribers can keep
+            # references to old frames; the buffer is freed when the last
+            # reference goes away.
+            t, img = self.sink.grabFrameInto(empty, self.timeout)
+            if t == 0:
+                continue
+
+            img.setflags(write=False)
+
+            with self._cond:
+                self._seq += 1
+                self._time = t
+                self._image = img
+                self._cond.notify_all()
+
+        logger.debug("Broadcast thread exited")
@@ -0,0 +1,262 @@
+"""
+Remembers what was learned about each USB camera the last time it was
+used, so that the next start doesn't have to wait for the camera to be
+probed before configuring it::
+
+    from cscore import cameracache
+
+    camera = cameracache.startAutomaticCapture(0)
+
+Cameras are identified by their stable device path (``/dev/v4l/by-path``
+on Linux) and by their USB vendor and product id. For each camera the
+cache stores its :class:`.UsbCameraInfo`, its video modes and the last
+configuration returned by ``getConfigJson()``.
+
+When a camera is started, the cached configuration is applied right away,
+before the camera connects. Once it connects, the camera is checked in the
+background and the cache is updated if anything changed.
+
+``python -m cscore --camera-cache`` uses this instead of
+``CameraServer.startAutomaticCapture()``.
+"""
+
+import json
+import os
+import os.path
+import threading
+import time
+import typing
+
+import logging
+
+from ._cscore import CameraServer, UsbCamera, VideoEventPoller
+
+logger = logging.getLogger("cscore.cameracache")
+
+#: Default location of the cache file
+DEFAULT_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "robotpy-cscore",
+    "cameras.json",
+)
+
+_VERSION = 1
+
+
+def _usb_id(vendorId: int, productId: int) -> str:
+    return "%04x:%04x" % (vendorId, productId)
+
+
+def _stable_path(path: str, otherPaths: typing.Sequence[str]) -> str:
+    for other in otherPaths:
+        if "/by-path/" in other:
+            return other
+    return path
+
+
+def _info_dict(info) -> typing.Dict[str, typing.Any]:
+    return {
+        "dev": info.dev,
+        "path": info.path,
+        "name": info.name,
+        "otherPaths": list(info.otherPaths),
+        "vendorId": info.vendorId,
+        "productId": info.productId,
+    }
+
+
+class CameraCache:
+    """
+    On-disk cache of USB camera information and configuration. Safe to
+    use from multiple threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        """
+        :param path: JSON file to store the cache in. It is created when
+                     the cache is first saved.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._cameras = {}
+
+        try:
+            with open(path) as fp:
+                data = json.load(fp)
+            if data.get("version") == _VERSION:
+                self._cameras = data.get("cameras", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring camera cache %s: %s", path, e)
+
+    def find(
+        self, dev: typing.Optional[int] = None, path: typing.Optional[str] = None
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Looks up a camera by device number or path. A camera whose cached
+        path no longer exists is not returned.
+
+        :returns: cache entry with ``info``, ``modes`` and ``config`` keys,
+                  or None
+        """
+        with self._lock:
+            for key, entry in self._cameras.items():
+                info = entry["info"]
+                if path is not None:
+                    if path != key and path != info["path"]:
+                        continue
+                elif info["dev"] != dev:
+                    continue
+                if os.path.exists(key):
+                    return entry
+        return None
+
+    def findUsbId(
+        self, vendorId: int, productId: int
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Looks up a camera by USB vendor and product id, for example to
+        reuse the configuration of a camera that was plugged into a
+        different port.
+        """
+        usb_id = _usb_id(vendorId, productId)
+        with self._lock:
+            for entry in self._cameras.values():
+                info = entry["info"]
+                if _usb_id(info["vendorId"], info["productId"]) == usb_id:
+                    return entry
+        return None
+
+    def update(self, camera: UsbCamera) -> bool:
+        """
+        Stores the current information and configuration of a connected
+        camera.
+
+        :returns: True if the cache changed
+        """
+        info = camera.getInfo()
+        entry = {
+            "info": _info_dict(info),
+            "modes": [
+                [int(m.pixelFormat), m.width, m.height, m.fps]
+                for m in camera.enumerateVideoModes()
+            ],
+            "config": camera.getConfigJson(),
+        }
+
+        key = _stable_path(info.path, info.otherPaths)
+        with self._lock:
+            old = self._cameras.get(key)
+            if old is not None and all(old.get(k) == v for k, v in entry.items()):
+                return False
+            entry["updated"] = time.time()
+            self._cameras[key] = entry
+
+        self.save()
+        return True
+
+    def save(self) -> None:
+        """Writes the cache to disk"""
+        with self._lock:
+            data = json.dumps({"version": _VERSION, "cameras": self._cameras}, indent=2)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as fp:
+                fp.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Could not save camera cache %s: %s", self.path, e)
+
+
+def _verify(cache: CameraCache, camera: UsbCamera, entry, timeout: float):
+    with VideoEventPoller(VideoEventPoller.kSourceConnected, True) as poller:
+        deadline = time.monotonic() + timeout
+        while not camera.isConnected():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning("%s did not connect", camera.getName())
+                return
+            poller.poll(remaining)
+
+    info = camera.getInfo()
+    if entry is None:
+        # same model of camera on another port, apply its config late
+        entry = cache.findUsbId(info.vendorId, info.productId)
+        if entry is not None and entry.get("config"):
+            logger.info("Applying config of a cached %s camera", entry["info"]["name"])
+            camera.setConfigJson(entry["config"])
+    else:
+        cached = entry["info"]
+        if (info.vendorId, info.productId) != (
+            cached["vendorId"],
+            cached["productId"],
+        ):
+            logger.warning(
+                "%s is a different camera than the cached one (%s instead of %s)",
+                camera.getName(),
+                _usb_id(info.vendorId, info.productId),
+                _usb_id(cached["vendorId"], cached["productId"]),
+            )
+
+    if cache.update(camera):
+        logger.info("Updated camera cache for %s", camera.getName())
+
+
+def startAutomaticCapture(
+    dev: int = 0,
+    *,
+    path: typing.Optional[str] = None,
+    name: typing.Optional[str] = None,
+    cache: typing.Optional[CameraCache] = None,
+    verify_timeout: float = 30.0,
+) -> UsbCamera:
+    """
+    Starts capturing from a USB camera like
+    ``CameraServer.startAutomaticCapture(dev)``, applying its cached
+    configuration before it connects.
+
+    :param dev:            Device number of the camera
+    :param path:           Path of the camera, overrides dev
+    :param name:           Name of the camera, defaults to
+                           ``USB Camera <dev>``
+    :param cache:          Cache to use, defaults to :data:`DEFAULT_PATH`
+    :param verify_timeout: How long the background check waits for the
+                           camera to connect, in seconds
+
+    :returns: the camera
+    """
+    if cache is None:
+        cache = CameraCache()
+    if name is None:
+        name = "USB Camera %d" % dev
+
+    entry = cache.find(dev=dev, path=path)
+
+    if path is not None:
+        camera = UsbCamera(name, path)
+    elif entry is not None:
+        # the stable path keeps referring to the same port
+        info = entry["info"]
+        camera = UsbCamera(name, _stable_path(info["path"], info["otherPaths"]))
+    else:
+        camera = UsbCamera(name, dev)
+
+    if entry is not None and entry.get("config"):
+        if not camera.setConfigJson(entry["config"]):
+            logger.warning("Could not apply cached config to %s", name)
+        else:
+            logger.info("Applied cached config to %s", name)
+
+    CameraServer.startAutomaticCapture(camera)
+
+    threading.Thread(
+        target=_verify,
+        args=(cache, camera, entry, verify_timeout),
+        name="camera-cache",
+        daemon=True,
+    ).start()
+
+    return camera
@@ -0,0 +1,147 @@
+"""
+Shares JPEG encoded frames between consumers that want the same frame at
+the same resolution and quality.
+
+cscore's :class:`.MjpegServer` already shares encoded images between
+servers attached to the same source. This cache does the same for python
+code that streams or stores frames itself, for example several consumers
+of a :class:`.FrameBroadcaster`::
+
+    cache = EncodeCache()
+
+    # in each consumer
+    time, img = sub.get()
+    data = cache.encode(camera, time, img, quality=50, width=320, height=240)
+"""
+
+import collections
+import threading
+import typing
+
+import numpy as np
+
+
+class _Entry:
+    __slots__ = ["ready", "data", "error"]
+
+    def __init__(self):
+        self.ready = threading.Event()
+        self.data = None
+        self.error = None
+
+
+class EncodeCache:
+    """
+    Thread-safe cache of encoded frames, keyed by (source, width, height,
+    quality, frame time). Each distinct key is resized and encoded once;
+    threads that ask for a key that is being encoded wait for the result
+    instead of encoding it again.
+    """
+
+    def __init__(self, maxsize: int = 16):
+        """
+        :param maxsize: Number of encoded frames to keep. Only recent frames
+                        are requested, so this only needs to cover the
+                        number of distinct settings times a few frames.
+        """
+        self.maxsize = maxsize
+
+        #: number of requests served from the cache
+        self.hits = 0
+        #: number of requests that encoded a frame
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def encode(
+        self,
+        source,
+        time: int,
+        image: np.ndarray,
+        *,
+        quality: int = 80,
+        width: typing.Optional[int] = None,
+        height: typing.Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Returns the JPEG encoded image, encoding it if no other consumer
+        already did.
+
+        :param source:  Source the frame came from. Either a
+                        :class:`.VideoSource` or any hashable value that
+                        identifies it.
+        :param time:    Frame time, as returned by the sink
+        :param image:   Decoded frame
+        :param quality: JPEG quality (0-100)
+        :param width:   Width to resize to, or None for the original size
+        :param height:  Height to resize to, or None for the original size
+
+        :returns: encoded image. It is shared with other consumers, so it
+                  must not be modified.
+        """
+        h, w = image.shape[:2]
+        width = width or w
+        height = height or h
+
+        if hasattr(source, "getHandle"):
+            source = source.getHandle()
+
+        key = (source, width, height, quality, time)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                self.misses += 1
+                entry = self._entries[key] = _Entry()
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+
+        if not owner:
+            entry.ready.wait()
+            if entry.error is not None:
+                raise entry.error
+            return entry.data
+
+        try:
+            entry.data = self._encode(image, width, height, quality)
+        except Exception as e:
+            entry.error = e
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            raise
+        finally:
+            entry.ready.set()
+
+        return entry.data
+
+    def _encode(self, image, width, height, quality):
+        import cv2
+
+        if image.shape[1] != width or image.shape[0] != height:
+            image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+
+        ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise IOError("Could not encode image")
+        data.setflags(write=False)
+        return data
+
+    def getStats(self) -> typing.Dict[str, int]:
+        """:returns: dictionary of hits, misses and cached entries"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        """Discards all cached frames. Counters are not reset."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,188 @@
+import threading
+import typing
+
+import numpy as np
+
+from ._cscore import CvSink
+
+
+class Frame:
+    """
+    A frame that was grabbed into a buffer owned by a :class:`FramePool`.
+    The buffer must be given back to the pool via :meth:`release` once
+    you are done with it, or it cannot be reused. Frames can also be used
+    as a context manager::
+
+        with pool.grab() as frame:
+            process(frame.image)
+    """
+
+    __slots__ = ("image", "time", "seq", "_pool", "_index")
+
+    def __init__(self, pool: "FramePool", index: int):
+        self._pool = pool
+        self._index = index
+        #: numpy array containing the image
+        self.image = pool._buffers[index]
+        #: Frame time as returned by :meth:`.CvSink.grabFrame`
+        self.time = 0
+        #: Sequence number of this frame, starts at 1
+        self.seq = 0
+
+    def release(self) -> None:
+        """Returns the buffer of this frame to the pool"""
+        if self._pool is not None:
+            self._pool._release(self._index)
+            self._pool = None
+
+    def __enter__(self) -> "Frame":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
+
+
+class FramePool:
+    """
+    A fixed set of preallocated image buffers that a :class:`.CvSink` can
+    grab frames into. Because each grabbed frame keeps its buffer until it
+    is released, you can hold on to a frame (for example, while another
+    thread processes it) and grab the next one without allocating.
+
+    The pool also keeps track of how many frames the camera delivered that
+    were never grabbed, which is estimated from the frame times and the
+    framerate of the sink's source.
+
+    Intended usage is::
+
+        pool = FramePool(cvSink, 3, (480, 640, 3))
+
+        while True:
+            frame = pool.grab()
+            if frame is None:
+                continue
+
+            queue.put(frame)  # consumer calls frame.release() when done
+    """
+
+    def __init__(
+        self,
+        sink: CvSink,
+        count: int,
+        shape: typing.Tuple[int, ...],
+        dtype=np.uint8,
+    ):
+        """
+        :param sink:  Sink to grab frames from
+        :param count: Number of buffers in the pool
+        :param shape: Shape of each buffer, should match the frames
+                      produced by the sink's source
+        :param dtype: Data type of each buffer
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1")
+
+        self.sink = sink
+        self._buffers = [np.zeros(shape, dtype=dtype) for _ in range(count)]
+        self._free = list(range(count))
+        self._cond = threading.Condition()
+
+        self._seq = 0
+        self._dropped = 0
+        self._last_time = 0
+        self._period = None
+        self._source = None
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the most recently grabbed frame"""
+        return self._seq
+
+    @property
+    def dropped(self) -> int:
+        """Number of frames delivered by the source that were never grabbed"""
+        return self._dropped
+
+    @property
+    def available(self) -> int:
+        """Number of buffers that are not currently acquired"""
+        with self._cond:
+            return len(self._free)
+
+    def acquire(self, timeout: typing.Optional[float] = None) -> typing.Optional[Frame]:
+        """
+        Acquires an unused buffer from the pool without grabbing a frame
+        into it.
+
+        :param timeout: Seconds to wait for a buffer to be released, or None
+                        to wait forever
+
+        :returns: a :class:`Frame`, or None if no buffer became available
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._free, timeout):
+                return None
+            return Frame(self, self._free.pop())
+
+    def grab(
+        self, timeout: float = 0.225, acquire_timeout: typing.Optional[float] = None
+    ) -> typing.Optional[Frame]:
+        """
+        Acquires a buffer and grabs the next frame from the sink into it.
+
+        :param timeout:         Frame retrieval timeout in seconds
+        :param acquire_timeout: Seconds to wait for a buffer to be released,
+                                or None to wait forever
+
+        :returns: a :class:`Frame`, or None if no buffer was available or an
+                  error occurred. Call :meth:`.CvSink.getError` to retrieve
+                  the error.
+        """
+        frame = self.acquire(acquire_timeout)
+        if frame is None:
+            return None
+
+        t, img = self.sink.grabFrameInto(frame.image, timeout)
+        if t == 0:
+            frame.release()
+            return None
+
+        if img is not frame.image:
+            # the frame didn't fit, so keep the buffer cscore allocated
+            self._buffers[frame._index] = img
+            frame.image = img
+
+        with self._cond:
+            self._seq += 1
+            frame.seq = self._seq
+            frame.time = t
+            self._account(t)
+
+        return frame
+
+    def _account(self, t: int) -> None:
+        source = self.sink.getSource()
+        handle = source.getHandle()
+        if handle != self._source:
+            # frames of different sources can't be compared
+            self._source = handle
+            self._period = None
+            self._last_time = 0
+
+        if self._period is None:
+            # the framerate may not be known until the source connects
+            fps = source.getVideoMode().fps
+            if fps > 0:
+                self._period = 1000000.0 / fps
+
+        if self._last_time and self._period:
+            missed = round((t - self._last_time) / self._period) - 1
+            if missed > 0:
+                self._dropped += missed
+
+        self._last_time = t
+
+    def _release(self, index: int) -> None:
+        with self._cond:
+            self._free.append(index)
+            self._cond.notify()
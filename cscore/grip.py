@@ -1,41 +1,230 @@
+import functools
 import inspect
+import threading
+import time
+import typing
 
-from .cameraserver import CameraServer
+import logging
 
+from ntcore import _now
 
-def run(grip_pipeline):
+from ._cscore import CameraServer
+from .framepool import Frame, FramePool
+from .replay import ReplaySource
+
+logger = logging.getLogger("cscore.grip")
+
+
+class StepTimer:
+    """
+    Measures how long each step of a GRIP-generated pipeline takes.
+
+    GRIP generates a private method for each step of the pipeline, which
+    is called from ``process``. Each of those methods (and ``process``
+    itself) is replaced on the pipeline instance with a wrapper that
+    records the number of calls, total time and worst time.
+    """
+
+    def __init__(self, pipeline):
+        #: step name -> [calls, total seconds, max seconds]
+        self.steps = {}
+
+        # name mangling strips leading underscores from the class name
+        prefix = "_%s__" % type(pipeline).__name__.lstrip("_")
+        for attr, value in inspect.getmembers(type(pipeline)):
+            if attr.startswith(prefix) and callable(value):
+                name = attr[len(prefix) :]
+                setattr(pipeline, attr, self._wrap(name, getattr(pipeline, attr)))
+
+        pipeline.process = self._wrap("process", pipeline.process)
+
+    def _wrap(self, name: str, fn: typing.Callable) -> typing.Callable:
+        stats = self.steps[name] = [0, 0.0, 0.0]
+        perf_counter = time.perf_counter
+
+        @functools.wraps(fn)
+        def _timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                stats[0] += 1
+                stats[1] += elapsed
+                if elapsed > stats[2]:
+                    stats[2] = elapsed
+
+        return _timed
+
+    def collect(self) -> typing.Dict[str, typing.Tuple[int, float, float]]:
+        """
+        Returns the timings since the last call and resets them.
+
+        :returns: dictionary of step name -> (calls, average ms, max ms)
+        """
+        result = {}
+        for name, stats in self.steps.items():
+            calls, total, worst = stats
+            stats[:] = [0, 0.0, 0.0]
+            avg = total / calls if calls else 0.0
+            result[name] = (calls, avg * 1000.0, worst * 1000.0)
+        return result
+
+
+class _Capture:
+    """Grabs frames in a background thread, keeping only the latest one"""
+
+    def __init__(self, pool: FramePool):
+        self.pool = pool
+        self.skipped = 0
+
+        self._cond = threading.Condition()
+        self._ready = False
+        self._frame = None
+        self._grabbed = 0
+
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+
+    def get(self) -> typing.Tuple[typing.Optional[Frame], int]:
+        """
+        Waits for the next frame, returns the frame (None if the grab
+        failed) and the time the grab returned
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._ready)
+            frame = self._frame
+            self._ready = False
+            self._frame = None
+            return frame, self._grabbed
+
+    def _run(self):
+        while True:
+            frame = self.pool.grab()
+            grabbed = _now()
+            with self._cond:
+                if self._frame is not None:
+                    # processing fell behind, replace the unprocessed frame
+                    self._frame.release()
+                    self.skipped += 1
+                self._frame = frame
+                self._grabbed = grabbed
+                self._ready = True
+                self._cond.notify()
+
+
+def _report(timer: StepTimer, table, skipped: int) -> None:
+    timings = timer.collect()
+    for name, (calls, avg, worst) in timings.items():
+        if table is not None:
+            step = table.getSubTable(name)
+            step.putNumber("calls", calls)
+            step.putNumber("avg_ms", avg)
+            step.putNumber("max_ms", worst)
+    if table is not None:
+        table.putNumber("skipped", skipped)
+
+    logger.debug(
+        "%d frames skipped, step timings: %s",
+        skipped,
+        ", ".join(
+            "%s %.2fms (max %.2fms)" % (name, avg, worst)
+            for name, (_, avg, worst) in timings.items()
+        ),
+    )
+
+
+def run(
+    grip_pipeline,
+    *,
+    report_period: float = 5.0,
+    publish_timings: bool = True,
+    track_latency: bool = False,
+    source=None
+):
     """
     A function that can be used to run python image processing code
     as generated by GRIP
+
+    Frames are captured in a background thread while the previous frame
+    is being processed. If processing falls behind, only the latest frame
+    is processed.
+
+    :param grip_pipeline:   GRIP pipeline class or object
+    :param report_period:   How often to report step timings, in seconds
+    :param publish_timings: Publish step timings to the ``GRIP/timing``
+                            NetworkTables subtable in addition to logging
+                            them
+    :param track_latency:   Publish frame latency percentiles, see
+                            :mod:`cscore.latency`
+    :param source:          Source to process instead of the first camera,
+                            for example a :class:`.ReplaySource`
     """
 
     if inspect.isclass(grip_pipeline):
         grip_pipeline = grip_pipeline()
 
-    cs = CameraServer.getInstance()
-    cs.enableLogging()
+    timer = StepTimer(grip_pipeline)
+
+    table = None
+    if publish_timings:
+        from ntcore import NetworkTableInstance
 
-    cs.startAutomaticCapture()
-    cvSink = cs.getVideo()
+        table = NetworkTableInstance.getDefault().getTable("GRIP").getSubTable("timing")
+
+    tracker = None
+    if track_latency:
+        from .latency import LatencyTracker
+
+        tracker = LatencyTracker("GRIP")
+
+    CameraServer.enableLogging()
+
+    if source is None:
+        camera = CameraServer.startAutomaticCapture()
+    else:
+        CameraServer.startAutomaticCapture(source)
+        camera = source
+    cvSink = CameraServer.getVideo()
+
+    # one frame being processed, one ready and one being captured
+    mode = camera.getVideoMode()
+    capture = _Capture(FramePool(cvSink, 3, (mode.height, mode.width, 3)))
+
+    replay = source if isinstance(source, ReplaySource) else None
+    if replay is not None:
+        # the capture thread is grabbing now, so no frames are missed
+        replay.start()
 
     outputStream = None
-    img = None
+    last_report = time.monotonic()
 
     while True:
-        time, img = cvSink.grabFrame(img)
-        if time == 0:
-            if outputStream:
+        frame, grabbed = capture.get()
+        if frame is None:
+            if outputStream is not None:
                 outputStream.notifyError(cvSink.getError())
 
             continue
 
-        # Process it with GRIP
-        out_img = grip_pipeline.process(img)
-        if out_img is not None:
-            try:
-                outputStream.putFrame(out_img)
-            except AttributeError:
+        try:
+            # Process it with GRIP
+            out_img = grip_pipeline.process(frame.image)
+            if out_img is not None:
                 if outputStream is None:
-                    outputStream = cs.putVideo("GRIP", img.shape[1], img.shape[0])
-                else:
-                    raise
+                    outputStream = CameraServer.putVideo(
+                        "GRIP", out_img.shape[1], out_img.shape[0]
+                    )
+                processed = _now()
+                outputStream.putFrame(out_img)
+                if tracker is not None:
+                    tracker.record(frame.time, grabbed, processed, _now())
+        finally:
+            frame.release()
+            if replay is not None:
+                replay.advance()
+
+        now = time.monotonic()
+        if now - last_report >= report_period:
+            _report(timer, table, capture.skipped)
+            last_report = now
@@ -1,4 +1,7 @@
+import collections
+import os
 import os.path
+import shutil
 import time
 import threading
 
@@ -7,8 +10,153 @@ import numpy as np
 
 import logging
 
+from .recording import RecordingWriter
+
 logger = logging.getLogger("cscore.storage")
 
+# name of the subdirectory created for each session
+_session_format = "%Y-%m-%d %H.%M.%S"
+
+
+def _is_session(name):
+    try:
+        time.strptime(name, _session_format)
+    except ValueError:
+        return False
+    return True
+
+
+def _sessions(root):
+    """Session directories in root, oldest first"""
+    return sorted(
+        entry.path
+        for entry in os.scandir(root)
+        if entry.is_dir() and _is_session(entry.name)
+    )
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class _DiskMonitor:
+    """
+    Keeps track of how much space is left for recordings, and deletes the
+    oldest recording sessions when it runs out. Only directories named like
+    a session are counted or deleted, anything else in the root is left
+    alone.
+    """
+
+    #: headroom below which the quota is considered low, as a fraction
+    low_quota = 0.1
+
+    def __init__(self, root, max_bytes, min_free_bytes, check_period):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.min_free_bytes = min_free_bytes
+        self.check_period = check_period
+
+        #: 'ok', 'low', 'full' or 'error'
+        self.state = "ok"
+        #: 1.0 when there is plenty of space, dropping to 0.0 when full
+        self.headroom = 1.0
+        #: bytes used by all recording sessions
+        self.used = None
+        #: free bytes on the disk
+        self.free = None
+        self.sessions_deleted = 0
+
+        self._lock = threading.Lock()
+        self._last_check = None
+
+    def added(self, nbytes):
+        with self._lock:
+            if self.used is not None:
+                self.used += nbytes
+
+    def _available(self):
+        available = float("inf")
+        if self.max_bytes is not None:
+            available = self.max_bytes - self.used
+        if self.min_free_bytes is not None:
+            available = min(available, self.free - self.min_free_bytes)
+        return available
+
+    def _headroom(self):
+        # a limit of 0 has no low range, there either is space or there isn't
+        ratios = [1.0]
+        if self.max_bytes is not None:
+            low = self.max_bytes * self.low_quota
+            remaining = self.max_bytes - self.used
+            ratios.append(remaining / low if low > 0 else float(remaining > 0))
+        if self.min_free_bytes is not None:
+            low = self.min_free_bytes
+            remaining = self.free - self.min_free_bytes
+            ratios.append(remaining / low if low > 0 else float(remaining > 0))
+        return max(0.0, min(ratios))
+
+    def _delete_oldest(self, current):
+        sessions = [path for path in _sessions(self.root) if path != current]
+        if not sessions:
+            return False
+
+        oldest = sessions[0]
+        size = _dir_size(oldest)
+        logger.warning("Low on space, deleting %s", oldest)
+        shutil.rmtree(oldest, ignore_errors=True)
+
+        self.used -= size
+        self.free += size
+        self.sessions_deleted += 1
+        return True
+
+    def check(self, current, force=False):
+        """
+        Updates the amount of space available, deleting old sessions if
+        needed. Only does anything every ``check_period`` seconds unless
+        ``force`` is True.
+
+        :param current: Directory of the current session, never deleted.
+                        None if it hasn't been created yet.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if (
+                not force
+                and self._last_check is not None
+                and now - self._last_check < self.check_period
+            ):
+                return
+            self._last_check = now
+
+            try:
+                if self.used is None:
+                    self.used = sum(_dir_size(path) for path in _sessions(self.root))
+                self.free = shutil.disk_usage(self.root).free
+
+                while self._available() <= 0 and self._delete_oldest(current):
+                    pass
+            except OSError as e:
+                logger.error("Error checking disk space: %s", e)
+                self.state = "error"
+                self.headroom = 0.0
+                return
+
+            self.headroom = self._headroom()
+            if self._available() <= 0:
+                self.state = "full"
+            elif self.headroom < 1.0:
+                self.state = "low"
+            else:
+                self.state = "ok"
+
 
 class ImageWriter:
     """
@@ -39,6 +187,23 @@ class ImageWriter:
             if self.logging_enabled:
                 self.image_writer.setImage(img)
 
+    If ``pretrigger`` is specified, images are kept in memory instead of
+    being written. Calling :meth:`trigger` writes the buffered images
+    from before the trigger, plus any images set during the trigger
+    duration::
+
+        self.image_writer = ImageWriter(pretrigger=2.0)
+
+        ..
+
+        while True:
+
+            img = ..
+            self.image_writer.setImage(img)
+
+            if something_interesting:
+                self.image_writer.trigger(3.0)
+
     """
 
     def __init__(
@@ -46,7 +211,20 @@ class ImageWriter:
         *,
         location_root="/media/sda1/camera",
         capture_period=0.5,
-        image_format="jpg"
+        image_format="jpg",
+        workers=1,
+        queue_size=2,
+        drop_policy="oldest",
+        chunk_size=None,
+        pretrigger=None,
+        pretrigger_bytes=16 * 1024 * 1024,
+        pretrigger_scale=None,
+        max_bytes=None,
+        min_free_bytes=None,
+        jpeg_quality=95,
+        min_jpeg_quality=50,
+        max_period_scale=4.0,
+        disk_check_period=5.0
     ):
         """
         :param location_root: Directory to write images to. A subdirectory
@@ -55,20 +233,106 @@ class ImageWriter:
                               subdirectory.
         :param capture_period: How often to write images to disk
         :param image_format: File extension of files to write
+        :param workers: Number of threads that encode and write images
+        :param queue_size: Maximum number of images waiting to be written
+        :param drop_policy: What to do when the queue is full. ``"oldest"``
+                            replaces the oldest waiting image, ``"newest"``
+                            ignores the new image.
+        :param chunk_size: If specified, images are appended to chunk files
+                           of up to this many bytes instead of being
+                           written as individual files. Use
+                           :class:`.RecordingReader` to read them back.
+        :param pretrigger: If specified, only write images after
+                           :meth:`trigger` is called, including this many
+                           seconds of images from before the trigger
+        :param pretrigger_bytes: Maximum amount of memory used to hold
+                                 images from before a trigger
+        :param pretrigger_scale: If not specified, images held in memory
+                                 are encoded. Otherwise they are kept
+                                 unencoded, resized by this factor (for
+                                 example, 0.5), and only encoded if they
+                                 are written.
+        :param max_bytes: If specified, the maximum number of bytes that
+                          all sessions in ``location_root`` may use. The
+                          oldest sessions are deleted to stay below it.
+        :param min_free_bytes: If specified, the oldest sessions in
+                               ``location_root`` are deleted to keep at
+                               least this many bytes free on the disk
+        :param jpeg_quality: JPEG quality to use when there is enough space
+        :param min_jpeg_quality: As space runs low, the JPEG quality is
+                                 gradually lowered down to this value
+        :param max_period_scale: As space runs low, the capture period is
+                                 gradually increased up to this multiple
+        :param disk_check_period: How often to check the available space,
+                                  in seconds
         """
 
+        if drop_policy not in ("oldest", "newest"):
+            raise ValueError("drop_policy must be 'oldest' or 'newest'")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+
         self.location_root = os.path.abspath(location_root)
         self.capture_period = capture_period
         self.image_format = image_format
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.chunk_size = chunk_size
+        self.pretrigger = pretrigger
+        self.pretrigger_bytes = pretrigger_bytes
+        self.pretrigger_scale = pretrigger_scale
+        self.jpeg_quality = jpeg_quality
+        self.min_jpeg_quality = min_jpeg_quality
+        self.max_period_scale = max_period_scale
+
+        self._disk = None
+        if max_bytes is not None or min_free_bytes is not None:
+            self._disk = _DiskMonitor(
+                self.location_root, max_bytes, min_free_bytes, disk_check_period
+            )
 
         self.active = True
+        self._closing = False
         self._location = None
-        self.has_image = False
-        self.size = None
+        self._recording = None
+        self._last_capture = 0
+
+        #: Number of images accepted for writing
+        self.queued = 0
+        #: Number of images written to disk
+        self.written = 0
+        #: Number of accepted images that were dropped because the queue was full
+        self.dropped = 0
+        #: Number of images that were not written because the disk budget
+        #: was used up
+        self.disk_dropped = 0
+        #: Total number of bytes written to disk
+        self.bytes_written = 0
+        #: Number of images that could not be written
+        self.write_errors = 0
+
+        self._stats_time = time.monotonic()
+        self._stats_bytes = 0
+
+        self._queue = collections.deque()
+        self._free = []
+
+        # images from before a trigger: (timestamp, payload, size, is_raw),
+        # where payload is an unencoded image if is_raw is True and the
+        # encoded image otherwise
+        self._ring = collections.deque()
+        self._ring_bytes = 0
+        self._trigger_until = 0
+        # buffered images to write after a trigger: (timestamp, payload, is_raw)
+        self._flush = collections.deque()
 
         self.lock = threading.Condition()
-        self._thread = threading.Thread(target=self._run, daemon=True)
-        self._thread.start()
+        self._threads = [
+            threading.Thread(target=self._run, name="imagewriter-%d" % i, daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
 
     def setImage(self, img):
         """
@@ -78,69 +342,312 @@ class ImageWriter:
         :param img: A numpy array representing an OpenCV image
         """
 
-        if not self.active:
+        if not self.active or self._closing:
             return
 
-        if (
-            self.size is None
-            or self.size[0] != img.shape[0]
-            or self.size[1] != img.shape[1]
+        now = time.time()
+        if now - self._last_capture < self.capture_period * self._period_scale():
+            return
+
+        with self.lock:
+            if len(self._queue) >= self.queue_size:
+                if self.drop_policy == "newest":
+                    self.dropped += 1
+                    return
+                _, old = self._queue.popleft()
+                self._free.append(old)
+                self.dropped += 1
+
+            buf = self._get_buffer(img)
+
+        # copy outside of the lock so writers aren't blocked
+        np.copyto(buf, img)
+        self._last_capture = now
+
+        with self.lock:
+            self._queue.append((now, buf))
+            self.queued += 1
+            self.lock.notify()
+
+    def _get_buffer(self, img):
+        while self._free:
+            buf = self._free.pop()
+            if buf.shape == img.shape and buf.dtype == img.dtype:
+                return buf
+        return np.empty_like(img)
+
+    def trigger(self, duration=0):
+        """
+        Writes the images held in memory in the background, and keeps
+        writing images set in the next ``duration`` seconds. Only valid
+        if ``pretrigger`` was specified.
+
+        :param duration: Number of seconds to keep writing images for
+        """
+        if self.pretrigger is None:
+            raise ValueError("trigger requires pretrigger to be specified")
+
+        with self.lock:
+            self._trigger_until = max(self._trigger_until, time.time() + duration)
+            self._flush.extend(
+                (t, payload, is_raw) for t, payload, _, is_raw in self._ring
+            )
+            self._ring.clear()
+            self._ring_bytes = 0
+            self.lock.notify_all()
+
+    def close(self, timeout=None):
+        """
+        Writes the images that are waiting to be written, then stops the
+        storage threads. Images set afterwards are ignored.
+
+        :param timeout: Seconds to wait for each thread, or None to wait
+                        until all of them have exited
+        """
+        with self.lock:
+            self._closing = True
+            self.lock.notify_all()
+
+        for thread in self._threads:
+            thread.join(timeout)
+
+        with self.lock:
+            self.active = False
+            if self._recording is not None:
+                self._recording.close()
+
+    def _buffer(self, now, payload, size, is_raw):
+        # must be called with the lock held
+        self._ring.append((now, payload, size, is_raw))
+        self._ring_bytes += size
+
+        while self._ring and (
+            self._ring_bytes > self.pretrigger_bytes
+            or self._ring[0][0] < now - self.pretrigger
         ):
-            h, w = img.shape[:2]
-            self.size = (h, w)
+            _, _, old_size, _ = self._ring.popleft()
+            self._ring_bytes -= old_size
+
+    def _period_scale(self):
+        if self._disk is None:
+            return 1.0
+        return 1.0 + (self.max_period_scale - 1.0) * (1.0 - self._disk.headroom)
 
-            self.out1 = np.empty((h, w, 3), dtype=np.uint8)
-            self.out2 = np.empty((h, w, 3), dtype=np.uint8)
+    def _quality(self):
+        if self._disk is None:
+            return self.jpeg_quality
+        q = self.min_jpeg_quality
+        return int(q + (self.jpeg_quality - q) * self._disk.headroom)
 
+    def getStats(self):
+        """
+        :returns: dictionary of the number of images queued, written and
+                  dropped, the number of images waiting to be written, and
+                  the bytes written per second since the last call. If a
+                  disk budget was specified, also includes the disk state,
+                  the number of images dropped because the disk was full,
+                  and the current JPEG quality and capture period.
+        """
         with self.lock:
-            cv2.copyMakeBorder(
-                img, 0, 0, 0, 0, cv2.BORDER_CONSTANT, value=(0, 0, 255), dst=self.out1
+            now = time.monotonic()
+            elapsed = now - self._stats_time
+            rate = (self.bytes_written - self._stats_bytes) / elapsed if elapsed else 0
+            self._stats_time = now
+            self._stats_bytes = self.bytes_written
+
+            stats = {
+                "queued": self.queued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "pending": len(self._queue) + len(self._flush),
+                "buffered": len(self._ring),
+                "buffered_bytes": self._ring_bytes,
+                "bytes_per_sec": rate,
+                "write_errors": self.write_errors,
+            }
+
+        disk = self._disk
+        if disk is not None:
+            stats.update(
+                disk_state=disk.state,
+                disk_dropped=self.disk_dropped,
+                disk_used=disk.used,
+                disk_free=disk.free,
+                sessions_deleted=disk.sessions_deleted,
+                jpeg_quality=self._quality(),
+                capture_period=self.capture_period * self._period_scale(),
             )
-            self.has_image = True
-            self.lock.notify()
+
+        return stats
 
     @property
     def location(self):
-        if self._location is None:
-            # This assures that we only log when a USB memory stick is plugged in
-            if not os.path.exists(self.location_root):
-                raise IOError(
-                    "Logging disabled, %s does not exist" % self.location_root
-                )
-
-            # Can't do this when program starts, time might be wrong. Ideally by now the DS
-            # has connected, so the time will be correct
-            self._location = self.location_root + "/%s" % time.strftime(
-                "%Y-%m-%d %H.%M.%S"
-            )
-            logger.info("Logging to %s", self._location)
-            os.makedirs(self._location, exist_ok=True)
+        with self.lock:
+            if self._location is None:
+                # This assures that we only log when a USB memory stick is plugged in
+                if not os.path.exists(self.location_root):
+                    raise IOError(
+                        "Logging disabled, %s does not exist" % self.location_root
+                    )
+
+                # Can't do this when program starts, time might be wrong. Ideally by now the DS
+                # has connected, so the time will be correct
+                location = self.location_root + "/%s" % time.strftime(_session_format)
+                logger.info("Logging to %s", location)
+                os.makedirs(location, exist_ok=True)
+                self._location = location
+
+            return self._location
+
+    @property
+    def recording(self):
+        with self.lock:
+            if self._recording is None:
+                self._recording = RecordingWriter(self.location, self.chunk_size)
+            return self._recording
 
-        return self._location
+    def _write(self, now, data):
+        disk = self._disk
 
-    def _run(self):
-        last = time.time()
+        try:
+            location = self.location
+        except OSError as e:
+            # no disk plugged in, or nothing to make room with
+            if disk is None or not os.path.exists(self.location_root):
+                raise
+
+            # probably out of space, try to make some room
+            logger.error("Error creating session directory: %s", e)
+            with self.lock:
+                self.write_errors += 1
+            disk.check(None, force=True)
+            return
+
+        if disk is not None:
+            disk.check(location)
+            if disk.state in ("full", "error"):
+                disk.check(location, force=True)
+                if disk.state in ("full", "error"):
+                    with self.lock:
+                        self.disk_dropped += 1
+                    return
+
+        try:
+            if self.chunk_size is None:
+                fname = "%s/%.2f.%s" % (location, now, self.image_format)
+                with open(fname, "wb") as fp:
+                    fp.write(data)
+            else:
+                self.recording.append(now, data)
+        except OSError as e:
+            if disk is None:
+                raise
+
+            # probably out of space, try to make some room
+            logger.error("Error writing image: %s", e)
+            with self.lock:
+                self.write_errors += 1
+            disk.check(location, force=True)
+            return
+
+        if disk is not None:
+            disk.added(len(data))
+
+        with self.lock:
+            self.written += 1
+            self.bytes_written += len(data)
+
+    def _encode(self, img):
+        params = []
+        if self.image_format.lower() in ("jpg", "jpeg"):
+            params = [cv2.IMWRITE_JPEG_QUALITY, self._quality()]
+
+        ok, data = cv2.imencode("." + self.image_format, img, params)
+        if not ok:
+            raise IOError("Could not encode image as %s" % self.image_format)
+        return data
 
+    def _run(self):
         logger.info("Storage thread started")
 
         try:
             while True:
                 with self.lock:
-                    now = time.time()
-                    while (not self.has_image) or (now - last) < self.capture_period:
+                    while (
+                        self.active
+                        and not self._closing
+                        and not self._queue
+                        and not self._flush
+                    ):
                         self.lock.wait()
-                        now = time.time()
-
-                    self.out2, self.out1 = self.out1, self.out2
-                    self.has_image = False
 
-                fname = "%s/%.2f.%s" % (self.location, now, self.image_format)
-                cv2.imwrite(fname, self.out2)
-
-                last = now
+                    # when closing, exit once everything has been written
+                    if not self.active or not (self._queue or self._flush):
+                        break
+
+                    if self._flush:
+                        # buffered from before a trigger
+                        now, payload, is_raw = self._flush.popleft()
+                        img = None
+                    else:
+                        now, img = self._queue.popleft()
+
+                    buffering = (
+                        self.pretrigger is not None and now > self._trigger_until
+                    )
+
+                if img is None:
+                    if is_raw:
+                        payload = self._encode(payload)
+                    self._write(now, payload)
+                    continue
+
+                try:
+                    if buffering and self.pretrigger_scale is not None:
+                        small = cv2.resize(
+                            img,
+                            None,
+                            fx=self.pretrigger_scale,
+                            fy=self.pretrigger_scale,
+                            interpolation=cv2.INTER_AREA,
+                        )
+                        with self.lock:
+                            # trigger() may have been called in the meantime,
+                            # in which case the full size image is written
+                            buffering = now > self._trigger_until
+                            if buffering:
+                                self._buffer(now, small, small.nbytes, True)
+                        if buffering:
+                            continue
+
+                    data = self._encode(img)
+                finally:
+                    with self.lock:
+                        self._free.append(img)
+
+                if buffering:
+                    with self.lock:
+                        # trigger() may have been called in the meantime
+                        buffering = now > self._trigger_until
+                        if buffering:
+                            self._buffer(now, data, len(data), False)
+                    if buffering:
+                        continue
+
+                self._write(now, data)
 
         except IOError as e:
             logger.error("Error logging images: %s", e)
 
-        logger.warn("Storage thread exited")
-        self.active = False
+        logger.warning("Storage thread exited")
+
+        with self.lock:
+            if self._closing:
+                # close() waits for the other threads before closing it
+                return
+
+            self.active = False
+            self.lock.notify_all()
+
+            if self._recording is not None:
+                self._recording.close()
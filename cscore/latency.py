@@ -0,0 +1,225 @@
+"""
+Opt-in measurement of how old a frame is by the time it is published.
+
+Frame times returned by :meth:`.CvSink.grabFrame` are in the same time base
+as ``ntcore._now()``, so a frame can be followed from the moment it was
+captured through being grabbed, processed and put into a :class:`.CvSource`.
+Each stage is recorded into a fixed size histogram, and percentiles are
+periodically published to NetworkTables under ``/cscore/latency/<name>``.
+
+Intended usage is::
+
+    tracker = LatencyTracker("vision")
+    cvSink = tracker.sink(CameraServer.getVideo())
+    outputStream = tracker.source(CameraServer.putVideo("vision", 640, 480))
+
+    while True:
+        time, img = cvSink.grabFrame(img)
+        if time == 0:
+            continue
+
+        ..
+
+        # recorded when the frame is published
+        outputStream.putFrame(img)
+"""
+
+import threading
+import typing
+
+from ntcore import NetworkTableInstance
+from ntcore import _now
+
+from ._cscore import CvSink, CvSource
+
+#: Stages that are recorded by :class:`LatencyTracker`
+STAGES = ("grab", "process", "publish", "total")
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies with fixed size buckets. Recording a value is
+    constant time and never allocates.
+    """
+
+    def __init__(self, bucket_us: int = 100, buckets: int = 1000):
+        """
+        :param bucket_us: Width of each bucket in microseconds
+        :param buckets:   Number of buckets. Larger values are counted in an
+                          overflow bucket.
+        """
+        self.bucket_us = bucket_us
+        self.counts = [0] * (buckets + 1)
+        self.count = 0
+        self.max_us = 0
+
+    def record(self, us: int) -> None:
+        """Records a single latency in microseconds"""
+        idx = us // self.bucket_us
+        if idx >= len(self.counts) - 1:
+            idx = len(self.counts) - 1
+        elif idx < 0:
+            idx = 0
+        self.counts[idx] += 1
+        self.count += 1
+        if us > self.max_us:
+            self.max_us = us
+
+    def percentile(self, p: float) -> float:
+        """
+        :param p: percentile between 0 and 100
+
+        :returns: the latency in milliseconds that ``p`` percent of the
+                  recorded values are at or below, resolved to the bucket
+                  width
+        """
+        if self.count == 0:
+            return 0.0
+
+        target = self.count * p / 100.0
+        total = 0
+        last = len(self.counts) - 1
+        for idx, n in enumerate(self.counts):
+            total += n
+            if total >= target:
+                if idx == last:
+                    return self.max_us / 1000.0
+                return min((idx + 1) * self.bucket_us, self.max_us) / 1000.0
+
+        return self.max_us / 1000.0
+
+    def reset(self) -> None:
+        """Clears all recorded values"""
+        counts = self.counts
+        for i in range(len(counts)):
+            counts[i] = 0
+        self.count = 0
+        self.max_us = 0
+
+
+class LatencyTracker:
+    """
+    Records per-frame latencies of a single pipeline and publishes their
+    percentiles to NetworkTables.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        publish_period: float = 1.0,
+        ntinst: typing.Optional[NetworkTableInstance] = None
+    ):
+        """
+        :param name:           Name of the pipeline, used as the
+                               NetworkTables subtable name
+        :param publish_period: How often to publish percentiles, in seconds.
+                               Histograms are cleared after publishing.
+        :param ntinst:         NetworkTables instance to publish to. If None,
+                               the default instance is used.
+        """
+        if ntinst is None:
+            ntinst = NetworkTableInstance.getDefault()
+
+        self.name = name
+        self.table = ntinst.getTable("cscore").getSubTable("latency").getSubTable(name)
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+
+        self._period_us = int(publish_period * 1000000)
+        self._last_publish = _now()
+        self._lock = threading.Lock()
+
+        # state of the frame currently going through a wrapped sink/source
+        self._capture = 0
+        self._grabbed = 0
+
+    def record(self, capture: int, grabbed: int, processed: int, published: int):
+        """
+        Records the timestamps of a single frame. All times are in
+        microseconds in the ``ntcore._now()`` time base.
+
+        :param capture:   Frame time returned by the sink
+        :param grabbed:   Time the grab returned
+        :param processed: Time processing finished
+        :param published: Time the frame was published
+        """
+        h = self.histograms
+        with self._lock:
+            h["grab"].record(grabbed - capture)
+            h["process"].record(processed - grabbed)
+            h["publish"].record(published - processed)
+            h["total"].record(published - capture)
+
+            if published - self._last_publish >= self._period_us:
+                self._last_publish = published
+                self._publish()
+
+    def _publish(self) -> None:
+        for stage, hist in self.histograms.items():
+            t = self.table.getSubTable(stage)
+            t.putNumber("p50", hist.percentile(50))
+            t.putNumber("p95", hist.percentile(95))
+            t.putNumber("p99", hist.percentile(99))
+            t.putNumber("count", hist.count)
+            hist.reset()
+
+    def sink(self, sink: CvSink) -> "InstrumentedCvSink":
+        """Wraps a sink so that frames grabbed from it are tracked"""
+        return InstrumentedCvSink(sink, self)
+
+    def source(self, source: CvSource) -> "InstrumentedCvSource":
+        """Wraps a source so that frames put into it are recorded"""
+        return InstrumentedCvSource(source, self)
+
+
+class InstrumentedCvSink:
+    """
+    Forwards everything to a :class:`.CvSink`, remembering the capture and
+    grab times of the last frame grabbed. Create via
+    :meth:`LatencyTracker.sink`.
+    """
+
+    def __init__(self, sink: CvSink, tracker: LatencyTracker):
+        self._sink = sink
+        self._tracker = tracker
+
+    def __getattr__(self, name):
+        return getattr(self._sink, name)
+
+    def _grabbed(self, result):
+        if result[0] != 0:
+            self._tracker._capture = result[0]
+            self._tracker._grabbed = _now()
+        return result
+
+    def grabFrame(self, *args, **kwargs):
+        return self._grabbed(self._sink.grabFrame(*args, **kwargs))
+
+    def grabFrameNoTimeout(self, *args, **kwargs):
+        return self._grabbed(self._sink.grabFrameNoTimeout(*args, **kwargs))
+
+    def grabFrameInto(self, *args, **kwargs):
+        return self._grabbed(self._sink.grabFrameInto(*args, **kwargs))
+
+
+class InstrumentedCvSource:
+    """
+    Forwards everything to a :class:`.CvSource`, recording the latencies of
+    the last frame grabbed from the tracker's sink when a frame is put.
+    Create via :meth:`LatencyTracker.source`.
+    """
+
+    def __init__(self, source: CvSource, tracker: LatencyTracker):
+        self._source = source
+        self._tracker = tracker
+
+    def __getattr__(self, name):
+        return getattr(self._source, name)
+
+    def putFrame(self, image) -> None:
+        tracker = self._tracker
+        processed = _now()
+        self._source.putFrame(image)
+        if tracker._capture:
+            tracker.record(tracker._capture, tracker._grabbed, processed, _now())
+            tracker._capture = 0
@@ -0,0 +1,339 @@
+"""
+Load test for :class:`.MjpegServer`. Starts a synthetic :class:`.CvSource`
+streamed by an MjpegServer, then connects several HTTP clients to it and
+reports what each client actually received, along with the CPU used by the
+server.
+
+::
+
+    python -m cscore.loadtest --clients 4 --width 640 --height 480 \\
+        --query compression=30 --query resolution=320x240
+
+Each ``--query`` is the query string of one client (see the MjpegServer
+documentation for the supported parameters); if there are more clients
+than queries, the queries are reused in order.
+
+The clients run in a separate process, so the reported CPU usage is that
+of the source and the server only.
+
+Latency is measured from the frame time sent by the server in the
+``X-Timestamp`` header of each image to the time the image was received.
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import queue
+import socket
+import threading
+import time
+import typing
+
+import numpy as np
+
+from ntcore import _now
+
+
+class ClientResult:
+    """What a single client received"""
+
+    __slots__ = [
+        "query",
+        "frames",
+        "bytes",
+        "duration",
+        "latencies",
+        "error",
+    ]
+
+    def __init__(self, query: str):
+        #: query string the client requested
+        self.query = query
+        #: number of images received
+        self.frames = 0
+        #: number of image bytes received
+        self.bytes = 0
+        #: seconds the client was connected
+        self.duration = 0.0
+        #: latency of each image in milliseconds
+        self.latencies = []
+        #: error that stopped the client, if any
+        self.error = None
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.duration if self.duration else 0.0
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes / self.duration if self.duration else 0.0
+
+    def latency(self, percentile: float) -> float:
+        """:returns: latency percentile in milliseconds"""
+        if not self.latencies:
+            return 0.0
+        return float(np.percentile(self.latencies, percentile))
+
+
+def _client(
+    port: int, query: str, duration: float, result: ClientResult, host="localhost"
+) -> None:
+    path = "/stream.mjpg"
+    if query:
+        path += "?" + query
+
+    start = time.monotonic()
+    end = start + duration
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        conn.request("GET", path)
+        fp = conn.getresponse().fp
+
+        while time.monotonic() < end:
+            length = None
+            timestamp = None
+
+            # part headers, terminated by an empty line
+            while True:
+                line = fp.readline()
+                if not line:
+                    raise EOFError("server closed the stream")
+                line = line.strip()
+                if not line:
+                    if length is not None:
+                        break
+                    continue
+                key, _, value = line.partition(b":")
+                key = key.lower()
+                if key == b"content-length":
+                    length = int(value)
+                elif key == b"x-timestamp":
+                    timestamp = float(value)
+
+            data = fp.read(length)
+            now = _now()
+
+            result.frames += 1
+            result.bytes += len(data)
+            if timestamp is not None:
+                latency = (now - timestamp * 1000000.0) / 1000.0
+                # ignore timestamps that aren't in our time base
+                if 0 <= latency < 10000:
+                    result.latencies.append(latency)
+
+    except Exception as e:
+        result.error = str(e)
+    finally:
+        result.duration = time.monotonic() - start
+        conn.close()
+
+
+def run_clients(
+    port: int,
+    queries: typing.Sequence[str],
+    duration: float,
+    host: str = "localhost",
+) -> typing.List[ClientResult]:
+    """
+    Streams from an MjpegServer with one client thread per query string
+
+    :param port:     Port of the MjpegServer
+    :param queries:  Query string of each client, may be empty
+    :param duration: Seconds to stream for
+
+    :returns: result of each client, in the same order as queries
+    """
+    results = [ClientResult(q) for q in queries]
+    threads = [
+        threading.Thread(
+            target=_client,
+            args=(port, r.query, duration, r, host),
+            name="loadtest-client",
+            daemon=True,
+        )
+        for r in results
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def _client_process(port, queries, duration, result_queue):
+    result_queue.put(run_clients(port, queries, duration))
+
+
+def _wait_results(proc, result_queue, timeout: float) -> typing.List[ClientResult]:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return result_queue.get(timeout=1.0)
+        except queue.Empty:
+            pass
+
+        if proc.exitcode is not None:
+            # the results may have been sent just before it exited
+            try:
+                return result_queue.get(timeout=1.0)
+            except queue.Empty:
+                raise RuntimeError(
+                    "client process exited with code %d" % proc.exitcode
+                ) from None
+
+        if time.monotonic() > deadline:
+            raise RuntimeError("client process did not finish in time")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def _synthetic_frames(width: int, height: int, count: int = 30):
+    """Moving gradient with noise, so that frames don't compress trivially"""
+    rng = np.random.default_rng(0)
+    x = np.arange(width, dtype=np.uint16)
+    y = np.arange(height, dtype=np.uint16)[:, None]
+    frames = []
+    for i in range(count):
+        img = np.empty((height, width, 3), dtype=np.uint8)
+        img[:, :, 0] = (x + i * 8) % 256
+        img[:, :, 1] = (y + i * 4) % 256
+        img[:, :, 2] = rng.integers(0, 64, (height, width), dtype=np.uint8)
+        frames.append(img)
+    return frames
+
+
+def run(
+    clients: int,
+    queries: typing.Sequence[str] = ("",),
+    *,
+    width: int = 640,
+    height: int = 480,
+    fps: int = 30,
+    duration: float = 10.0,
+    port: typing.Optional[int] = None,
+) -> typing.Tuple[typing.List[ClientResult], float]:
+    """
+    Runs a load test
+
+    :param clients:  Number of concurrent clients
+    :param queries:  Query strings for the clients, reused in order if there
+                     are more clients than queries
+    :param width:    Width of the synthetic source
+    :param height:   Height of the synthetic source
+    :param fps:      Rate the synthetic source produces frames at
+    :param duration: Seconds to stream for
+    :param port:     Port for the MjpegServer, a free port if None
+
+    :returns: results of each client, and the CPU used by the source and
+              server as a percentage of one core
+    """
+    from ._cscore import CvSource, MjpegServer, VideoMode
+
+    if port is None:
+        port = _free_port()
+    queries = [queries[i % len(queries)] for i in range(clients)]
+
+    source = CvSource("loadtest", VideoMode.PixelFormat.kBGR, width, height, fps)
+    server = MjpegServer("loadtest", port)
+    server.setSource(source)
+
+    frames = _synthetic_frames(width, height)
+    stop = threading.Event()
+
+    def _produce():
+        period = 1.0 / fps
+        i = 0
+        next_time = time.monotonic()
+        while not stop.is_set():
+            source.putFrame(frames[i % len(frames)])
+            i += 1
+            next_time += period
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    producer = threading.Thread(target=_produce, name="loadtest-source", daemon=True)
+    producer.start()
+
+    ctx = multiprocessing.get_context("spawn")
+    result_queue = ctx.Queue()
+    proc = ctx.Process(
+        target=_client_process,
+        args=(port, queries, duration, result_queue),
+        daemon=True,
+    )
+
+    try:
+        # user and system time of all threads of this process, which
+        # doesn't include the clients
+        cpu = time.process_time()
+        wall = time.monotonic()
+        proc.start()
+        # starting a spawned interpreter can take a while on a slow machine
+        results = _wait_results(proc, result_queue, duration + 30.0)
+        wall = time.monotonic() - wall
+        cpu = time.process_time() - cpu
+        proc.join()
+    finally:
+        if proc.is_alive():
+            proc.terminate()
+        stop.set()
+        producer.join()
+
+    return results, 100.0 * cpu / wall if wall else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m cscore.loadtest",
+        description="Load test for MjpegServer with a synthetic source",
+    )
+    parser.add_argument("--clients", type=int, default=1, help="Number of clients")
+    parser.add_argument(
+        "--query",
+        action="append",
+        default=None,
+        help="Query string of a client (ex: compression=50&resolution=320x240)."
+        " May be specified multiple times",
+    )
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds to stream for"
+    )
+    parser.add_argument("--port", type=int, default=None, help="MjpegServer port")
+    args = parser.parse_args()
+
+    results, cpu = run(
+        args.clients,
+        args.query or [""],
+        width=args.width,
+        height=args.height,
+        fps=args.fps,
+        duration=args.duration,
+        port=args.port,
+    )
+
+    print(
+        "%-3s %-32s %8s %12s %9s %9s"
+        % ("#", "query", "fps", "bytes/s", "p50 ms", "p95 ms")
+    )
+    for i, r in enumerate(results):
+        print(
+            "%-3d %-32s %8.2f %12.0f %9.2f %9.2f"
+            % (i, r.query or "-", r.fps, r.bytes_per_sec, r.latency(50), r.latency(95))
+        )
+        if r.error:
+            print("    error: %s" % r.error)
+
+    print()
+    print("server cpu: %.1f%%" % cpu)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import concurrent.futures
+import copy
+import inspect
+import multiprocessing
+import threading
+import time
+
+import logging
+
+from ntcore import _now
+
+from ._cscore import CameraServer
+from .framepool import FramePool
+from .replay import ReplaySource
+
+logger = logging.getLogger("cscore.parallel")
+
+# pipeline instance owned by the current worker
+_local = threading.local()
+
+
+def _make_pipeline(pipeline):
+    if inspect.isclass(pipeline):
+        return pipeline()
+    return copy.deepcopy(pipeline)
+
+
+def _init_worker(pipeline) -> None:
+    _local.pipeline = _make_pipeline(pipeline)
+
+
+def _process(img):
+    return _local.pipeline.process(img)
+
+
+class ParallelRunner:
+    """
+    Runs a pipeline with a per-frame ``process(img)`` method on several
+    workers at once. Frames are grabbed from a single sink and dispatched
+    to the workers, and the results are published to the output source in
+    the order the frames were captured.
+
+    Each worker gets its own copy of the pipeline: if ``pipeline`` is a
+    class it is instantiated once per worker, otherwise the object is
+    deep-copied.
+
+    .. note:: Thread workers only scale if ``process`` spends most of its
+              time in code that releases the GIL, such as OpenCV. Process
+              workers don't have that limitation, but each frame is
+              copied to the worker and back. Worker processes are
+              started with the ``spawn`` method, so the pipeline must be
+              picklable and its class importable.
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        workers: int,
+        *,
+        processes: bool = False,
+        name: str = "parallel",
+        report_period: float = 5.0,
+        track_latency: bool = False,
+        source=None
+    ):
+        """
+        :param pipeline:      Pipeline class or object with a ``process`` method
+        :param workers:       Number of workers
+        :param processes:     Use worker processes instead of threads
+        :param name:          Name of the output stream
+        :param report_period: How often to log statistics, in seconds
+        :param track_latency: Publish frame latency percentiles, see
+                              :mod:`cscore.latency`
+        :param source:        Source to process instead of the first camera,
+                              for example a :class:`.ReplaySource`
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        self.pipeline = pipeline
+        self.workers = workers
+        self.processes = processes
+        self.name = name
+        self.report_period = report_period
+        self.source = source
+
+        #: Number of results published
+        self.published = 0
+        #: Number of results that finished before an earlier frame
+        self.out_of_order = 0
+        #: Number of results that failed with an exception
+        self.errors = 0
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._next_seq = 1
+        self._output = None
+
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+        self._latency_count = 0
+
+        self._tracker = None
+        if track_latency:
+            from .latency import LatencyTracker
+
+            self._tracker = LatencyTracker(name)
+
+    def run(self) -> None:
+        """Grabs and dispatches frames forever"""
+        CameraServer.enableLogging()
+
+        if self.source is None:
+            camera = CameraServer.startAutomaticCapture()
+        else:
+            CameraServer.startAutomaticCapture(self.source)
+            camera = self.source
+        cvSink = CameraServer.getVideo()
+
+        mode = camera.getVideoMode()
+        # one frame being grabbed and one queued per worker
+        pool = FramePool(cvSink, self.workers * 2 + 1, (mode.height, mode.width, 3))
+
+        if self.processes:
+            # forking a process that has cscore threads running is unsafe
+            executor = concurrent.futures.ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.pipeline,),
+            )
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                self.workers,
+                thread_name_prefix="worker",
+                initializer=_init_worker,
+                initargs=(self.pipeline,),
+            )
+
+        logger.info(
+            "Running pipeline on %d %s workers",
+            self.workers,
+            "process" if self.processes else "thread",
+        )
+
+        last_report = time.monotonic()
+
+        replay = self.source if isinstance(self.source, ReplaySource) else None
+
+        with executor:
+            if replay is not None:
+                replay.start()
+
+            while True:
+                frame = pool.grab()
+                if frame is None:
+                    if self._output is not None:
+                        self._output.notifyError(cvSink.getError())
+                    continue
+
+                if replay is not None:
+                    # the frames are queued for the workers, so playback
+                    # only has to wait for the grab
+                    replay.advance()
+
+                start = time.monotonic()
+                grabbed = _now()
+                future = executor.submit(_process, frame.image)
+                future.add_done_callback(
+                    lambda f, frame=frame, start=start, grabbed=grabbed: self._on_done(
+                        f, frame, start, grabbed
+                    )
+                )
+
+                now = time.monotonic()
+                if now - last_report >= self.report_period:
+                    self._report(now - last_report, pool.dropped)
+                    last_report = now
+
+    def _on_done(self, future, frame, start, grabbed) -> None:
+        with self._lock:
+            seq = frame.seq
+            if seq != self._next_seq:
+                self.out_of_order += 1
+
+            self._pending[seq] = (future, frame, start, grabbed)
+
+            # publish everything that is now in order
+            while self._next_seq in self._pending:
+                future, frame, start, grabbed = self._pending.pop(self._next_seq)
+                self._next_seq += 1
+                self._publish(future, frame, start, grabbed)
+
+    def _publish(self, future, frame, start, grabbed) -> None:
+        try:
+            try:
+                out_img = future.result()
+            except Exception:
+                self.errors += 1
+                logger.exception("Error processing frame %d", frame.seq)
+                return
+
+            if out_img is not None:
+                if self._output is None:
+                    self._output = CameraServer.putVideo(
+                        self.name, out_img.shape[1], out_img.shape[0]
+                    )
+                processed = _now()
+                self._output.putFrame(out_img)
+                self.published += 1
+                if self._tracker is not None:
+                    self._tracker.record(frame.time, grabbed, processed, _now())
+
+            latency = time.monotonic() - start
+            self._latency_sum += latency
+            self._latency_count += 1
+            if latency > self._latency_max:
+                self._latency_max = latency
+        finally:
+            frame.release()
+
+    def _report(self, elapsed: float, dropped: int) -> None:
+        with self._lock:
+            count = self._latency_count
+            avg = self._latency_sum / count if count else 0.0
+            worst = self._latency_max
+            self._latency_sum = 0.0
+            self._latency_max = 0.0
+            self._latency_count = 0
+
+        logger.info(
+            "%.1f fps, latency avg %.1fms max %.1fms, %d out of order, %d dropped, %d errors",
+            count / elapsed,
+            avg * 1000.0,
+            worst * 1000.0,
+            self.out_of_order,
+            dropped,
+            self.errors,
+        )
+
+
+def run(
+    pipeline,
+    workers: int,
+    *,
+    processes: bool = False,
+    track_latency: bool = False,
+    source=None
+) -> None:
+    """
+    Runs a pipeline with a per-frame ``process(img)`` method on several
+    workers. See :class:`ParallelRunner`.
+    """
+    ParallelRunner(
+        pipeline,
+        workers,
+        processes=processes,
+        track_latency=track_latency,
+        source=source,
+    ).run()
@@ -0,0 +1,176 @@
+"""
+Recordings store encoded frames appended to a small number of chunk files
+instead of one file per image, which is much cheaper on FAT formatted USB
+drives. Each chunk file ``chunk-NNNNN.bin`` has an index file
+``chunk-NNNNN.idx`` next to it, containing one fixed size record per frame
+with its timestamp, offset and length. Readers only need to load the index
+files to find a frame.
+"""
+
+import bisect
+import glob
+import os.path
+import struct
+import threading
+import typing
+
+#: timestamp (seconds), offset, length
+_index_record = struct.Struct("<dQI")
+
+
+def _chunk_name(path: str, n: int, ext: str) -> str:
+    return os.path.join(path, "chunk-%05d.%s" % (n, ext))
+
+
+class RecordingWriter:
+    """
+    Appends encoded frames to chunk files in a directory, starting a new
+    chunk when the current one reaches ``chunk_size`` bytes. Safe to use
+    from multiple threads.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 64 * 1024 * 1024):
+        """
+        :param path:       Directory to write chunk files to, must exist
+        :param chunk_size: Size in bytes after which a new chunk file is
+                           started
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+
+        self._lock = threading.Lock()
+        self._chunk = len(glob.glob(os.path.join(path, "chunk-*.bin")))
+        self._data = None
+        self._index = None
+        self._offset = 0
+
+    def append(self, timestamp: float, data: bytes) -> None:
+        """
+        Appends an encoded frame
+
+        :param timestamp: Time the frame was captured, in seconds
+        :param data:      Encoded frame
+        """
+        with self._lock:
+            if self._data is None or (
+                self._offset and self._offset + len(data) > self.chunk_size
+            ):
+                self._rotate()
+
+            self._data.write(data)
+            self._index.write(_index_record.pack(timestamp, self._offset, len(data)))
+            self._offset += len(data)
+
+            # flush both so that a crash loses at most the current frame
+            self._data.flush()
+            self._index.flush()
+
+    def _rotate(self) -> None:
+        self._close()
+        self._data = open(_chunk_name(self.path, self._chunk, "bin"), "wb")
+        self._index = open(_chunk_name(self.path, self._chunk, "idx"), "wb")
+        self._chunk += 1
+        self._offset = 0
+
+    def _close(self) -> None:
+        if self._data is not None:
+            self._data.close()
+            self._index.close()
+            self._data = None
+            self._index = None
+
+    def close(self) -> None:
+        """Closes the current chunk"""
+        with self._lock:
+            self._close()
+
+
+class RecordingReader:
+    """
+    Reads frames from a directory written by :class:`RecordingWriter`.
+    Frames are ordered by timestamp.
+
+    ::
+
+        reader = RecordingReader("/media/sda1/camera/2023-03-04 10.11.12")
+        for timestamp, img in reader.decode(reader.seek(start_time)):
+            ..
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Directory containing chunk files
+        """
+        self.path = path
+
+        entries = []
+        for idx_name in sorted(glob.glob(os.path.join(path, "chunk-*.idx"))):
+            bin_name = idx_name[:-3] + "bin"
+            with open(idx_name, "rb") as fp:
+                raw = fp.read()
+
+            # ignore a partially written record at the end
+            usable = len(raw) - len(raw) % _index_record.size
+            for timestamp, offset, length in _index_record.iter_unpack(raw[:usable]):
+                entries.append((timestamp, bin_name, offset, length))
+
+        entries.sort(key=lambda e: e[0])
+        self._entries = entries
+        #: Sorted timestamps of all frames
+        self.timestamps = [e[0] for e in entries]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def seek(self, timestamp: float) -> int:
+        """
+        :returns: index of the first frame at or after ``timestamp``
+        """
+        return bisect.bisect_left(self.timestamps, timestamp)
+
+    def read(self, i: int) -> typing.Tuple[float, bytes]:
+        """
+        :returns: timestamp and encoded data of frame ``i``
+        """
+        timestamp, bin_name, offset, length = self._entries[i]
+        with open(bin_name, "rb") as fp:
+            fp.seek(offset)
+            return timestamp, fp.read(length)
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[float, bytes]]:
+        return self.frames()
+
+    def frames(self, start: int = 0) -> typing.Iterator[typing.Tuple[float, bytes]]:
+        """
+        Iterates over the encoded frames starting at index ``start``,
+        keeping chunk files open between frames.
+        """
+        fp = None
+        current = None
+        try:
+            for timestamp, bin_name, offset, length in self._entries[start:]:
+                if bin_name != current:
+                    if fp is not None:
+                        fp.close()
+                    fp = open(bin_name, "rb")
+                    current = bin_name
+                fp.seek(offset)
+                yield timestamp, fp.read(length)
+        finally:
+            if fp is not None:
+                fp.close()
+
+    def decode(self, start: int = 0):
+        """
+        Iterates over the frames starting at index ``start``, decoding
+        each one with OpenCV.
+
+        :returns: iterator of (timestamp, image)
+        """
+        import cv2
+        import numpy as np
+
+        for timestamp, data in self.frames(start):
+            yield timestamp, cv2.imdecode(
+                np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED
+            )
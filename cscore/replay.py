@@ -0,0 +1,301 @@
+"""
+Plays back recorded footage as a regular source, so that a pipeline can
+run without a camera::
+
+    from cscore import CameraServer
+    from cscore.replay import ReplaySource
+
+    source = ReplaySource("/media/sda1/camera/2023-03-04 10.11.12")
+    CameraServer.startAutomaticCapture(source)
+    sink = CameraServer.getVideo()
+    source.start()
+
+The path may be a session directory written by :class:`.ImageWriter`
+(either individual images or a recording, see :mod:`cscore.recording`)
+or a video file that OpenCV can read.
+
+``python -m cscore --replay PATH`` uses a replay source instead of the
+first camera.
+"""
+
+import glob
+import os.path
+import queue
+import threading
+import time
+import typing
+
+import numpy as np
+
+import logging
+
+from ._cscore import CvSource, VideoMode
+
+logger = logging.getLogger("cscore.replay")
+
+_image_exts = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def _session_images(path):
+    """Images written by ImageWriter, named by their timestamp"""
+    files = []
+    for name in os.listdir(path):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in _image_exts:
+            continue
+        try:
+            files.append((float(stem), os.path.join(path, name)))
+        except ValueError:
+            pass
+    files.sort()
+    return files
+
+
+def _decode(data):
+    import cv2
+
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def _decoded(path, encoded):
+    for timestamp, data in encoded:
+        img = _decode(data)
+        if img is None:
+            # for example, an image that was only partially written
+            logger.warning(
+                "Skipping frame %.2f of %s, could not decode it", timestamp, path
+            )
+            continue
+        yield timestamp, img
+
+
+def _read_images(files):
+    for timestamp, fname in files:
+        with open(fname, "rb") as fp:
+            yield timestamp, fp.read()
+
+
+def _open_frames(path) -> typing.Iterator[typing.Tuple[float, np.ndarray]]:
+    """
+    :returns: iterator of (timestamp in seconds, BGR image). Frames that
+              can't be decoded are skipped.
+    """
+    if os.path.isdir(path):
+        if glob.glob(os.path.join(path, "chunk-*.idx")):
+            from .recording import RecordingReader
+
+            yield from _decoded(path, RecordingReader(path).frames())
+            return
+
+        yield from _decoded(path, _read_images(_session_images(path)))
+        return
+
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError("Could not open %s" % path)
+    try:
+        while True:
+            ok, img = cap.read()
+            if not ok:
+                break
+            yield cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0, img
+    finally:
+        cap.release()
+
+
+class ReplaySource(CvSource):
+    """
+    A :class:`.CvSource` that plays back recorded frames. Frames are read
+    and decoded on a prefetch thread that stays at most ``lookahead``
+    frames ahead of playback, and are put to the source at their original
+    timing or as fast as possible.
+
+    Playback begins when :meth:`start` is called, so that the consumer can
+    connect its sink first and doesn't miss the first frames.
+
+    .. note:: Sinks only keep the most recent frame, so a consumer that is
+              slower than playback will skip frames. Use ``lockstep`` to
+              have playback wait for the consumer instead.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        name: typing.Optional[str] = None,
+        speed: typing.Optional[float] = 1.0,
+        loop: bool = False,
+        lookahead: int = 8,
+        lockstep: bool = False,
+        lockstep_timeout: float = 1.0,
+    ):
+        """
+        :param path:      Session directory or video file to play
+        :param name:      Source name, defaults to the file name of path
+        :param speed:     Playback speed relative to the original timing,
+                          or None to play as fast as frames can be decoded
+        :param loop:      Start over at the end of the footage
+        :param lookahead: Maximum number of decoded frames waiting to be
+                          played
+        :param lockstep:  Put each frame only after :meth:`advance` was
+                          called for the previous one, so that a consumer
+                          gets every frame no matter how slow it is
+        :param lockstep_timeout: In lockstep mode, if :meth:`advance` isn't
+                                 called within this many seconds the frame
+                                 is put again, in case the consumer started
+                                 waiting for it after it was put
+        """
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.lockstep = lockstep
+        self.lockstep_timeout = lockstep_timeout
+
+        frames = _open_frames(path)
+        first = next(frames, None)
+        if first is None:
+            raise ValueError("No frames found in %s" % path)
+
+        h, w = first[1].shape[:2]
+
+        fps = 30
+        second = next(frames, None)
+        if second is not None and second[0] > first[0]:
+            fps = max(1, int(round(1.0 / (second[0] - first[0]))))
+
+        if name is None:
+            name = os.path.basename(os.path.normpath(path))
+
+        super().__init__(name, VideoMode(VideoMode.PixelFormat.kBGR, w, h, fps))
+
+        #: Number of frames put to the source
+        self.played = 0
+        #: Number of times a frame was put again in lockstep mode
+        self.repeated = 0
+        #: Set when playback is finished
+        self.done = threading.Event()
+
+        self._queue = queue.Queue(maxsize=max(1, lookahead))
+        self._stop = threading.Event()
+        self._advance = threading.Event()
+
+        initial = [first] if second is None else [first, second]
+
+        self._prefetch = threading.Thread(
+            target=self._prefetch_thread,
+            args=(initial, frames),
+            name="%s-prefetch" % name,
+            daemon=True,
+        )
+        self._playback = threading.Thread(
+            target=self._playback_thread, name="%s-playback" % name, daemon=True
+        )
+        # decoding ahead doesn't need to wait for the consumer
+        self._prefetch.start()
+
+    def start(self) -> None:
+        """
+        Starts playback. Call this once the consumer's sink is connected to
+        this source. Does nothing if playback was already started.
+        """
+        if not self._playback.is_alive() and not self.done.is_set():
+            self._playback.start()
+
+    def advance(self) -> None:
+        """
+        In lockstep mode, lets playback put the next frame. Call this once
+        the consumer is waiting for the next frame, for example after a
+        grab thread handed off the previous frame.
+        """
+        self._advance.set()
+
+    def stop(self) -> None:
+        """Stops playback"""
+        self._stop.set()
+        self._advance.set()
+        if self._playback.is_alive():
+            self._playback.join()
+        self._prefetch.join()
+
+    def wait(self, timeout: typing.Optional[float] = None) -> bool:
+        """
+        Waits for playback to finish
+
+        :returns: True if playback finished, False on timeout
+        """
+        return self.done.wait(timeout)
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _prefetch_thread(self, initial, frames):
+        try:
+            while True:
+                for item in initial:
+                    if not self._put(item):
+                        return
+                for item in frames:
+                    if not self._put(item):
+                        return
+
+                if not self.loop:
+                    break
+
+                # marks the start of the next pass
+                if not self._put(None):
+                    return
+                initial = []
+                frames = _open_frames(self.path)
+        except Exception:
+            logger.exception("Error reading %s", self.path)
+        finally:
+            self._put(StopIteration)
+
+    def _playback_thread(self):
+        start = None
+        first_ts = 0.0
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    item = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+                if item is StopIteration:
+                    break
+                if item is None:
+                    start = None
+                    continue
+
+                timestamp, img = item
+                if self.speed is not None:
+                    now = time.monotonic()
+                    if start is None:
+                        start = now
+                        first_ts = timestamp
+                    delay = start + (timestamp - first_ts) / self.speed - now
+                    if delay > 0 and self._stop.wait(delay):
+                        break
+
+                self._advance.clear()
+                self.putFrame(img)
+                self.played += 1
+
+                if self.lockstep:
+                    while not self._advance.wait(self.lockstep_timeout):
+                        if self._stop.is_set():
+                            return
+                        self.putFrame(img)
+                        self.repeated += 1
+        finally:
+            logger.info("Replay of %s finished after %d frames", self.path, self.played)
+            self.done.set()
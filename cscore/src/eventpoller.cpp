@@ -0,0 +1,145 @@
+#include <optional>
+#include <stdexcept>
+#include <vector>
+
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+#include "cscore_cpp.h"
+
+namespace py = pybind11;
+
+// Wraps the cscore listener poller API, so that python code can retrieve
+// events in batches instead of receiving a callback on a cscore thread
+// for each event.
+
+namespace {
+
+class VideoEventPoller {
+public:
+  VideoEventPoller(int eventMask, bool immediateNotify) {
+    m_poller = cs::CreateListenerPoller();
+    CS_Status status = 0;
+    m_listener =
+        cs::AddPolledListener(m_poller, eventMask, immediateNotify, &status);
+    if (status != 0) {
+      cs::DestroyListenerPoller(m_poller);
+      m_poller = 0;
+      throw std::runtime_error("could not add polled listener");
+    }
+  }
+
+  ~VideoEventPoller() { Close(); }
+
+  py::list Poll(std::optional<double> timeout) {
+    if (!m_poller) {
+      throw std::runtime_error("poller is closed");
+    }
+
+    std::vector<cs::RawEvent> events;
+    {
+      py::gil_scoped_release unlock;
+      if (timeout) {
+        bool timedOut = false;
+        events = cs::PollListener(m_poller, *timeout, &timedOut);
+      } else {
+        events = cs::PollListener(m_poller);
+      }
+    }
+
+    py::list out(events.size());
+    size_t i = 0;
+    for (auto &e : events) {
+      py::object mode = py::none();
+      if (e.kind == cs::RawEvent::kSourceVideoModeChanged) {
+        mode = py::cast(e.mode);
+      }
+      out[i++] = py::make_tuple(static_cast<int>(e.kind), e.sourceHandle,
+                                e.sinkHandle, e.propertyHandle, e.name,
+                                e.value, e.valueStr, mode);
+    }
+    return out;
+  }
+
+  void Cancel() {
+    if (m_poller) {
+      cs::CancelPollListener(m_poller);
+    }
+  }
+
+  void Close() {
+    if (m_poller) {
+      CS_Status status = 0;
+      cs::RemoveListener(m_listener, &status);
+      cs::CancelPollListener(m_poller);
+      cs::DestroyListenerPoller(m_poller);
+      m_poller = 0;
+    }
+  }
+
+private:
+  CS_ListenerPoller m_poller = 0;
+  CS_Listener m_listener = 0;
+};
+
+} // namespace
+
+void setupEventPoller(py::module &m) {
+  py::class_<VideoEventPoller> cls(
+      m, "VideoEventPoller",
+      "Receives library events in batches. Unlike :class:`VideoListener`,\n"
+      "no python code runs on cscore threads; events are queued until\n"
+      ":meth:`poll` is called.\n"
+      "\n"
+      "Each event is a tuple of (kind, source handle, sink handle, property\n"
+      "handle, name, value, valueStr, mode). Handles can be compared with\n"
+      "``getHandle()`` of sources, sinks and properties. mode is a\n"
+      ":class:`VideoMode` for kSourceVideoModeChanged events, otherwise None.");
+
+  cls.def(py::init<int, bool>(), py::arg("eventMask"),
+          py::arg("immediateNotify") = false,
+          py::doc(":param eventMask: Bitmask of event kinds to receive\n"
+                  ":param immediateNotify: Generate events for the current\n"
+                  "                        state of the library immediately"))
+      .def("poll", &VideoEventPoller::Poll, py::arg("timeout") = py::none(),
+           py::doc("Waits for events.\n"
+                   "\n"
+                   ":param timeout: Seconds to wait, or None to wait forever\n"
+                   "\n"
+                   ":returns: list of event tuples, empty on timeout or if\n"
+                   "          :meth:`cancel` was called"))
+      .def("cancel", &VideoEventPoller::Cancel,
+           py::doc("Wakes up a thread blocked in :meth:`poll`"))
+      .def("close", &VideoEventPoller::Close,
+           py::doc("Stops receiving events and releases the poller"))
+      .def("__enter__", [](VideoEventPoller &self) -> VideoEventPoller & {
+        return self;
+      }, py::return_value_policy::reference)
+      .def("__exit__", [](VideoEventPoller &self, py::args) { self.Close(); });
+
+#define EVENT_KIND(name)                                                       \
+  cls.attr(#name) = static_cast<int>(cs::RawEvent::name)
+
+  EVENT_KIND(kSourceCreated);
+  EVENT_KIND(kSourceDestroyed);
+  EVENT_KIND(kSourceConnected);
+  EVENT_KIND(kSourceDisconnected);
+  EVENT_KIND(kSourceVideoModesUpdated);
+  EVENT_KIND(kSourceVideoModeChanged);
+  EVENT_KIND(kSourcePropertyCreated);
+  EVENT_KIND(kSourcePropertyValueUpdated);
+  EVENT_KIND(kSourcePropertyChoicesUpdated);
+  EVENT_KIND(kSinkSourceChanged);
+  EVENT_KIND(kSinkCreated);
+  EVENT_KIND(kSinkDestroyed);
+  EVENT_KIND(kSinkEnabled);
+  EVENT_KIND(kSinkDisabled);
+  EVENT_KIND(kNetworkInterfacesChanged);
+  EVENT_KIND(kTelemetryUpdated);
+  EVENT_KIND(kSinkPropertyCreated);
+  EVENT_KIND(kSinkPropertyValueUpdated);
+  EVENT_KIND(kSinkPropertyChoicesUpdated);
+  EVENT_KIND(kUsbCamerasChanged);
+
+#undef EVENT_KIND
+}
@@ -0,0 +1,110 @@
+#include <chrono>
+#include <condition_variable>
+#include <deque>
+#include <mutex>
+#include <string>
+
+#include <pybind11/pybind11.h>
+
+#include "cscore_cpp.h"
+
+namespace py = pybind11;
+
+// cscore logs from its own threads. Instead of calling into python (and
+// grabbing the GIL) for every message, messages are queued here and a
+// python thread drains them in batches.
+
+namespace {
+
+struct LogRecord {
+  unsigned int level;
+  std::string file;
+  unsigned int line;
+  std::string msg;
+  unsigned int count;
+};
+
+struct LogQueue {
+  std::mutex mutex;
+  std::condition_variable cv;
+  std::deque<LogRecord> records;
+  size_t maxSize = 1024;
+  uint64_t dropped = 0;
+};
+
+LogQueue &GetQueue() {
+  // intentionally leaked, cscore threads may still log during shutdown
+  static LogQueue *queue = new LogQueue;
+  return *queue;
+}
+
+void Push(unsigned int level, const char *file, unsigned int line,
+          const char *msg) {
+  auto &q = GetQueue();
+  {
+    std::lock_guard lock{q.mutex};
+    if (!q.records.empty()) {
+      // collapse repeats of the same message
+      auto &last = q.records.back();
+      if (last.line == line && last.level == level && last.file == file &&
+          last.msg == msg) {
+        last.count++;
+        return;
+      }
+    }
+
+    if (q.records.size() >= q.maxSize) {
+      q.dropped++;
+      return;
+    }
+
+    q.records.push_back(LogRecord{level, file, line, msg, 1});
+  }
+  q.cv.notify_one();
+}
+
+} // namespace
+
+void setupLogQueue(py::module &m) {
+  m.def(
+      "_setQueuedLogger",
+      [](unsigned int minLevel, size_t maxSize) {
+        auto &q = GetQueue();
+        {
+          std::lock_guard lock{q.mutex};
+          q.maxSize = maxSize;
+        }
+        cs::SetLogger(Push, minLevel);
+      },
+      py::arg("minLevel"), py::arg("maxSize") = 1024,
+      py::doc("Queue cscore log messages, retrieve them with _drainLogQueue"));
+
+  m.def(
+      "_drainLogQueue",
+      [](double timeout) {
+        auto &q = GetQueue();
+        std::deque<LogRecord> records;
+        uint64_t dropped;
+        {
+          py::gil_scoped_release unlock;
+          std::unique_lock lock{q.mutex};
+          q.cv.wait_for(lock, std::chrono::duration<double>(timeout),
+                        [&] { return !q.records.empty(); });
+          records.swap(q.records);
+          dropped = q.dropped;
+          q.dropped = 0;
+        }
+
+        py::list out;
+        for (auto &r : records) {
+          out.append(py::make_tuple(r.level, r.file, r.line, r.msg, r.count));
+        }
+        return py::make_tuple(out, dropped);
+      },
+      py::arg("timeout"),
+      py::doc("Waits up to timeout seconds for queued log messages.\n"
+              "\n"
+              ":returns: list of (level, file, line, msg, repeat count) and\n"
+              "          the number of messages dropped because the queue\n"
+              "          was full"));
+}
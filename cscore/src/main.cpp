@@ -3,8 +3,19 @@
 
 #include "cscore_cpp.h"
 
+void setupEventPoller(py::module &m);
+void setupLogQueue(py::module &m);
+void setupProperties(py::module &m);
+void setupRaw(py::module &m);
+void setupStats(py::module &m);
+
 RPYBUILD_PYBIND11_MODULE(m) {
     initWrapper(m);
+    setupEventPoller(m);
+    setupLogQueue(m);
+    setupProperties(m);
+    setupRaw(m);
+    setupStats(m);
 
     static int unused; // the capsule needs something to reference
     py::capsule cleanup(&unused, [](void *) {
@@ -0,0 +1,238 @@
+#include <algorithm>
+#include <optional>
+#include <span>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include <pybind11/pybind11.h>
+
+#include <wpi/SmallVector.h>
+
+#include "cscore_oo.h"
+
+namespace py = pybind11;
+
+// Reads and writes all properties of a source or sink in a single call,
+// instead of one getProperty() lookup and one get/set per property.
+
+namespace {
+
+struct PropertyValue {
+  std::string name;
+  CS_PropertyKind kind = CS_PROP_NONE;
+  int value = 0;
+  std::string str;
+  CS_Status status = 0;
+};
+
+struct PropertyRequest {
+  std::string name;
+  bool isString = false;
+  int value = 0;
+  std::string str;
+  CS_Status status = 0;
+};
+
+// must be called without the GIL
+std::vector<std::pair<std::string, CS_Property>>
+NamedProperties(std::span<CS_Property> handles) {
+  std::vector<std::pair<std::string, CS_Property>> named;
+  named.reserve(handles.size());
+  for (CS_Property handle : handles) {
+    CS_Status status = 0;
+    named.emplace_back(cs::GetPropertyName(handle, &status), handle);
+  }
+  return named;
+}
+
+py::object ToPython(const PropertyValue &p) {
+  switch (p.kind) {
+  case CS_PROP_BOOLEAN:
+    return py::bool_(p.value != 0);
+  case CS_PROP_STRING:
+    return py::str(p.str);
+  default:
+    return py::int_(p.value);
+  }
+}
+
+template <typename Enumerate> py::dict GetProperties(Enumerate enumerate) {
+  std::vector<PropertyValue> values;
+  {
+    py::gil_scoped_release unlock;
+    wpi::SmallVector<CS_Property, 32> buf;
+    for (auto &[name, handle] : NamedProperties(enumerate(buf))) {
+      PropertyValue p;
+      p.name = name;
+      p.kind = cs::GetPropertyKind(handle, &p.status);
+      if (p.kind == CS_PROP_STRING) {
+        p.str = cs::GetStringProperty(handle, &p.status);
+      } else {
+        p.value = cs::GetProperty(handle, &p.status);
+      }
+      values.push_back(std::move(p));
+    }
+  }
+
+  py::dict out;
+  for (auto &p : values) {
+    if (p.status == 0) {
+      out[py::str(p.name)] = ToPython(p);
+    }
+  }
+  return out;
+}
+
+template <typename Enumerate>
+py::dict SetProperties(Enumerate enumerate, py::dict values,
+                       bool onlyChanged) {
+  // convert with the GIL held, in the order given
+  std::vector<PropertyRequest> requests;
+  requests.reserve(values.size());
+  for (auto item : values) {
+    PropertyRequest r;
+    r.name = py::cast<std::string>(item.first);
+    if (py::isinstance<py::str>(item.second)) {
+      r.isString = true;
+      r.str = py::cast<std::string>(item.second);
+    } else {
+      r.value = py::cast<int>(item.second);
+    }
+    requests.push_back(std::move(r));
+  }
+
+  std::vector<bool> touched(requests.size(), false);
+  {
+    py::gil_scoped_release unlock;
+    wpi::SmallVector<CS_Property, 32> buf;
+    auto named = NamedProperties(enumerate(buf));
+
+    for (size_t i = 0; i < requests.size(); i++) {
+      auto &r = requests[i];
+
+      std::optional<CS_Property> handle;
+      for (auto &[name, h] : named) {
+        if (name == r.name) {
+          handle = h;
+          break;
+        }
+      }
+      if (!handle) {
+        r.status = CS_INVALID_PROPERTY;
+        touched[i] = true;
+        continue;
+      }
+
+      auto kind = cs::GetPropertyKind(*handle, &r.status);
+
+      // enum properties may be set by the name of the choice
+      if (r.isString && kind == CS_PROP_ENUM) {
+        auto choices = cs::GetEnumPropertyChoices(*handle, &r.status);
+        auto it = std::find(choices.begin(), choices.end(), r.str);
+        if (it == choices.end()) {
+          r.status = CS_WRONG_PROPERTY_TYPE;
+          touched[i] = true;
+          continue;
+        }
+        r.isString = false;
+        r.value = static_cast<int>(it - choices.begin());
+      }
+
+      if (r.isString != (kind == CS_PROP_STRING)) {
+        r.status = CS_WRONG_PROPERTY_TYPE;
+        touched[i] = true;
+        continue;
+      }
+
+      if (onlyChanged) {
+        CS_Status status = 0;
+        bool same = r.isString
+                        ? cs::GetStringProperty(*handle, &status) == r.str
+                        : cs::GetProperty(*handle, &status) == r.value;
+        if (status == 0 && same) {
+          continue;
+        }
+      }
+
+      touched[i] = true;
+      if (r.isString) {
+        cs::SetStringProperty(*handle, r.str, &r.status);
+      } else {
+        cs::SetProperty(*handle, r.value, &r.status);
+      }
+    }
+  }
+
+  py::dict out;
+  for (size_t i = 0; i < requests.size(); i++) {
+    if (touched[i]) {
+      out[py::str(requests[i].name)] = requests[i].status;
+    }
+  }
+  return out;
+}
+
+template <typename T, typename Enumerate>
+void AddMethods(py::module &m, const char *className, Enumerate enumerate) {
+  py::object cls = m.attr(className);
+
+  cls.attr("getProperties") = py::cpp_function(
+      [enumerate](T &self) {
+        return GetProperties([&](auto &buf) {
+          return enumerate(self.GetHandle(), buf);
+        });
+      },
+      py::name("getProperties"), py::is_method(cls),
+      py::doc("Reads the values of all properties in a single call.\n"
+              "\n"
+              ":returns: dictionary of property name to value. Boolean\n"
+              "          properties are bool, string properties are str,\n"
+              "          everything else is int"));
+
+  cls.attr("setProperties") = py::cpp_function(
+      [enumerate](T &self, py::dict values) {
+        return SetProperties(
+            [&](auto &buf) { return enumerate(self.GetHandle(), buf); },
+            values, false);
+      },
+      py::name("setProperties"), py::is_method(cls), py::arg("values"),
+      py::doc("Sets several properties in a single call, in the order given.\n"
+              "Enum properties may be set by index or by choice name.\n"
+              "\n"
+              ":param values: dictionary of property name to value\n"
+              "\n"
+              ":returns: dictionary of property name to status, which is 0\n"
+              "          on success, otherwise the same status code as\n"
+              "          :meth:`VideoProperty.getLastStatus`"));
+
+  cls.attr("applySnapshot") = py::cpp_function(
+      [enumerate](T &self, py::dict snapshot) {
+        return SetProperties(
+            [&](auto &buf) { return enumerate(self.GetHandle(), buf); },
+            snapshot, true);
+      },
+      py::name("applySnapshot"), py::is_method(cls), py::arg("snapshot"),
+      py::doc("Like :meth:`setProperties`, but only sets the properties\n"
+              "whose current value differs, for example to restore a\n"
+              "snapshot taken with :meth:`getProperties`.\n"
+              "\n"
+              ":returns: dictionary of the status of each property that\n"
+              "          was set or could not be set"));
+}
+
+} // namespace
+
+void setupProperties(py::module &m) {
+  AddMethods<cs::VideoSource>(
+      m, "VideoSource",
+      [](CS_Source handle, wpi::SmallVectorImpl<CS_Property> &buf) {
+        CS_Status status = 0;
+        return cs::EnumerateSourceProperties(handle, buf, &status);
+      });
+  AddMethods<cs::VideoSink>(
+      m, "VideoSink", [](CS_Sink handle, wpi::SmallVectorImpl<CS_Property> &buf) {
+        CS_Status status = 0;
+        return cs::EnumerateSinkProperties(handle, buf, &status);
+      });
+}
@@ -0,0 +1,176 @@
+#include <memory>
+#include <stdexcept>
+#include <string>
+#include <tuple>
+#include <vector>
+
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+#include <pybind11/stl.h>
+
+#include "cscore_raw.h"
+
+namespace py = pybind11;
+
+// Binds RawSink and RawSource, which get and put frames without converting
+// them to or from BGR. The raw frame functions only accept handles of raw
+// sinks and sources, so these can't be methods of CvSink/CvSource.
+
+namespace {
+
+std::tuple<uint64_t, py::object, cs::VideoMode>
+GrabRawFrame(cs::RawSink &self, cs::VideoMode::PixelFormat pixelFormat,
+             int width, int height, double timeout) {
+  auto frame = std::make_unique<cs::RawFrame>();
+  frame->pixelFormat = pixelFormat;
+  frame->width = width;
+  frame->height = height;
+
+  CS_Status status = 0;
+  uint64_t result;
+  {
+    py::gil_scoped_release unlock;
+    result = cs::GrabSinkFrameTimeout(self.GetHandle(), *frame, timeout, &status);
+  }
+  if (result == 0 || status != 0) {
+    return std::make_tuple(0, py::none(), cs::VideoMode());
+  }
+
+  auto format = static_cast<cs::VideoMode::PixelFormat>(frame->pixelFormat);
+  cs::VideoMode mode{format, frame->width, frame->height, 0};
+  std::vector<py::ssize_t> shape;
+  switch (format) {
+  case cs::VideoMode::PixelFormat::kYUYV:
+  case cs::VideoMode::PixelFormat::kRGB565:
+    shape = {frame->height, frame->width, 2};
+    break;
+  case cs::VideoMode::PixelFormat::kBGR:
+    shape = {frame->height, frame->width, 3};
+    break;
+  case cs::VideoMode::PixelFormat::kGray:
+    shape = {frame->height, frame->width};
+    break;
+  default:
+    shape = {frame->dataLength};
+    break;
+  }
+
+  // the array takes ownership of the frame data, so no copy is made
+  auto data = frame->data;
+  py::capsule owner(frame.release(), [](void *f) {
+    delete static_cast<cs::RawFrame *>(f);
+  });
+  return std::make_tuple(
+      result, py::array(py::dtype::of<uint8_t>(), shape, data, owner), mode);
+}
+
+void PutRawFrame(cs::RawSource &self, py::buffer data,
+                 cs::VideoMode::PixelFormat pixelFormat, int width,
+                 int height) {
+  py::buffer_info info = data.request();
+  if (!PyBuffer_IsContiguous(info.view(), 'C')) {
+    throw py::value_error("data must be a contiguous buffer");
+  }
+
+  CS_RawFrame frame{};
+  frame.data = static_cast<char *>(info.ptr);
+  frame.dataLength = static_cast<int>(info.size * info.itemsize);
+  frame.totalData = frame.dataLength;
+  frame.pixelFormat = pixelFormat;
+  frame.width = width;
+  frame.height = height;
+
+  CS_Status status = 0;
+  {
+    py::gil_scoped_release unlock;
+    cs::PutSourceFrame(self.GetHandle(), frame, &status);
+  }
+  if (status != 0) {
+    throw std::runtime_error("could not put frame (status " +
+                             std::to_string(status) + ")");
+  }
+}
+
+} // namespace
+
+void setupRaw(py::module &m) {
+  py::class_<cs::RawSource, cs::ImageSource> source(
+      m, "RawSource",
+      "A source for user code to provide video frames that are already in\n"
+      "their final format, such as JPEG images.");
+
+  source
+      .def(py::init<std::string_view, const cs::VideoMode &>(),
+           py::arg("name"), py::arg("mode"),
+           py::doc(":param name: Source name (arbitrary unique identifier)\n"
+                   ":param mode: Video mode being generated"))
+      .def(py::init<std::string_view, cs::VideoMode::PixelFormat, int, int,
+                    int>(),
+           py::arg("name"), py::arg("pixelFormat"), py::arg("width"),
+           py::arg("height"), py::arg("fps"),
+           py::doc(":param name: Source name (arbitrary unique identifier)\n"
+                   ":param pixelFormat: Pixel format\n"
+                   ":param width: Width\n"
+                   ":param height: Height\n"
+                   ":param fps: Frames per second"))
+      .def("putFrame", &PutRawFrame, py::arg("data"), py::arg("pixelFormat"),
+           py::arg("width"), py::arg("height"),
+           py::doc("Put a frame into the source. The data is copied.\n"
+                   "\n"
+                   ":param data: Image data (bytes, bytearray or uint8 array)\n"
+                   ":param pixelFormat: Pixel format of the data\n"
+                   ":param width: Width of the image\n"
+                   ":param height: Height of the image\n"
+                   "\n"
+                   ":raises RuntimeError: if cscore rejected the frame"))
+      .def(
+          "putEncodedFrame",
+          [](cs::RawSource &self, py::buffer data, int width, int height) {
+            PutRawFrame(self, data, cs::VideoMode::PixelFormat::kMJPEG, width,
+                        height);
+          },
+          py::arg("data"), py::arg("width"), py::arg("height"),
+          py::doc(
+              "Put an already JPEG-encoded frame into the source. The frame\n"
+              "is not decoded unless a sink needs it in a different format,\n"
+              "so forwarding it to an MjpegServer costs a single copy.\n"
+              "\n"
+              "Use :meth:`.RawSink.grabFrame` with kMJPEG to get frames\n"
+              "without decoding them.\n"
+              "\n"
+              ":param data: JPEG-encoded image (bytes, bytearray or uint8\n"
+              "             array)\n"
+              ":param width: Width of the image\n"
+              ":param height: Height of the image\n"
+              "\n"
+              ":raises RuntimeError: if cscore rejected the frame"));
+
+  py::class_<cs::RawSink, cs::ImageSink> sink(
+      m, "RawSink",
+      "A sink for user code to accept video frames without converting them\n"
+      "to BGR.");
+
+  sink.def(py::init<std::string_view>(), py::arg("name"),
+           py::doc(":param name: Sink name (arbitrary unique identifier)"))
+      .def("grabFrame", &GrabRawFrame,
+           py::arg("pixelFormat") = cs::VideoMode::PixelFormat::kUnknown,
+           py::arg("width") = 0, py::arg("height") = 0,
+           py::arg("timeout") = 0.225,
+           py::doc(
+               "Wait for the next frame and get it in the requested format.\n"
+               "\n"
+               ":param pixelFormat: Desired pixel format. kUnknown returns the\n"
+               "                    frame in the format it was received from\n"
+               "                    the source, without any conversion.\n"
+               "                    kGray is cheap to produce from kYUYV.\n"
+               ":param width: Desired width, or 0 for the original width\n"
+               ":param height: Desired height, or 0 for the original height\n"
+               ":param timeout: Retrieval timeout in seconds\n"
+               "\n"
+               ":returns: Tuple of frame time (or 0 on error), image and\n"
+               "          VideoMode describing the image. The image is None on\n"
+               "          error. kMJPEG and unknown formats are returned as a\n"
+               "          flat uint8 array of the encoded bytes, kGray as\n"
+               "          (h, w), kYUYV and kRGB565 as (h, w, 2) and kBGR as\n"
+               "          (h, w, 3)."));
+}
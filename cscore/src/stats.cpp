@@ -0,0 +1,115 @@
+#include <string>
+#include <vector>
+
+#include <pybind11/pybind11.h>
+
+#include <wpi/SmallVector.h>
+
+#include "cscore_cpp.h"
+
+namespace py = pybind11;
+
+// Collects the metrics of every source and sink in a single call, for
+// cscore.stats
+
+namespace {
+
+struct SourceStats {
+  CS_Source handle;
+  std::string name;
+  int kind;
+  bool connected;
+  bool enabled;
+  uint64_t lastFrameTime;
+  double fps;
+  double dataRate;
+};
+
+struct SinkStats {
+  CS_Sink handle;
+  std::string name;
+  int kind;
+  CS_Source source;
+  int port;
+};
+
+py::tuple StatsSnapshot() {
+  std::vector<SourceStats> sources;
+  std::vector<SinkStats> sinks;
+
+  {
+    py::gil_scoped_release unlock;
+    CS_Status status = 0;
+
+    wpi::SmallVector<CS_Source, 16> sourceBuf;
+    for (CS_Source handle : cs::EnumerateSourceHandles(sourceBuf, &status)) {
+      status = 0;
+      SourceStats s;
+      s.handle = handle;
+      s.name = cs::GetSourceName(handle, &status);
+      s.kind = cs::GetSourceKind(handle, &status);
+      s.connected = cs::IsSourceConnected(handle, &status);
+      s.enabled = cs::IsSourceEnabled(handle, &status);
+      s.lastFrameTime = cs::GetSourceLastFrameTime(handle, &status);
+      s.fps = cs::GetTelemetryAverageValue(handle, CS_SOURCE_FRAMES_RECEIVED,
+                                           &status);
+      s.dataRate = cs::GetTelemetryAverageValue(
+          handle, CS_SOURCE_BYTES_RECEIVED, &status);
+      sources.push_back(std::move(s));
+
+      // enumerating added a reference
+      cs::ReleaseSource(handle, &status);
+    }
+
+    status = 0;
+    wpi::SmallVector<CS_Sink, 16> sinkBuf;
+    for (CS_Sink handle : cs::EnumerateSinkHandles(sinkBuf, &status)) {
+      status = 0;
+      SinkStats s;
+      s.handle = handle;
+      s.name = cs::GetSinkName(handle, &status);
+      s.kind = cs::GetSinkKind(handle, &status);
+      s.source = cs::GetSinkSource(handle, &status);
+      s.port = 0;
+      if (s.kind == CS_SINK_MJPEG) {
+        s.port = cs::GetMjpegServerPort(handle, &status);
+      }
+      sinks.push_back(std::move(s));
+
+      cs::ReleaseSink(handle, &status);
+    }
+  }
+
+  py::list pySources(sources.size());
+  for (size_t i = 0; i < sources.size(); i++) {
+    auto &s = sources[i];
+    pySources[i] = py::make_tuple(s.handle, s.name, s.kind, s.connected,
+                                  s.enabled, s.lastFrameTime, s.fps,
+                                  s.dataRate);
+  }
+
+  py::list pySinks(sinks.size());
+  for (size_t i = 0; i < sinks.size(); i++) {
+    auto &s = sinks[i];
+    pySinks[i] = py::make_tuple(s.handle, s.name, s.kind, s.source, s.port);
+  }
+
+  return py::make_tuple(pySources, pySinks);
+}
+
+} // namespace
+
+void setupStats(py::module &m) {
+  m.def("_statsSnapshot", &StatsSnapshot,
+        py::doc("Returns a tuple of lists of source and sink metrics tuples.\n"
+                "Use cscore.stats.snapshot() instead."));
+
+  m.def(
+      "_setTelemetryPeriod",
+      [](double seconds) {
+        py::gil_scoped_release unlock;
+        cs::SetTelemetryPeriod(seconds);
+      },
+      py::arg("seconds"),
+      py::doc("Sets how often the actual fps and data rate are computed"));
+}
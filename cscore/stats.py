@@ -0,0 +1,160 @@
+"""
+Health metrics for every source and sink, collected in a single call.
+
+::
+
+    from cscore import stats
+
+    sources, sinks = stats.snapshot()
+    for row in sources[~sources["connected"]]:
+        print("disconnected:", row["name"])
+
+.. note:: ``fps`` and ``dataRate`` are computed by cscore's telemetry,
+          which is only updated if a telemetry period is set. Use
+          :func:`setTelemetryPeriod` or :class:`StatsPublisher` to set it.
+"""
+
+import threading
+import typing
+
+import numpy as np
+
+import logging
+
+from ._cscore import _setTelemetryPeriod, _statsSnapshot
+
+logger = logging.getLogger("cscore.stats")
+
+#: dtype of the source records returned by :func:`snapshot`
+SOURCE_DTYPE = np.dtype(
+    [
+        ("handle", np.int32),
+        ("name", object),
+        ("kind", np.int32),
+        ("connected", np.bool_),
+        ("enabled", np.bool_),
+        ("lastFrameTime", np.uint64),
+        ("fps", np.float64),
+        ("dataRate", np.float64),
+    ]
+)
+
+#: dtype of the sink records returned by :func:`snapshot`
+SINK_DTYPE = np.dtype(
+    [
+        ("handle", np.int32),
+        ("name", object),
+        ("kind", np.int32),
+        ("source", np.int32),
+        ("port", np.int32),
+    ]
+)
+
+
+def setTelemetryPeriod(seconds: float) -> None:
+    """
+    Sets how often cscore computes the actual fps and data rate of each
+    source.
+
+    :param seconds: Telemetry period in seconds
+    """
+    _setTelemetryPeriod(seconds)
+
+
+def snapshot() -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Collects the metrics of every source and sink.
+
+    :returns: tuple of source and sink record arrays, see
+              :data:`SOURCE_DTYPE` and :data:`SINK_DTYPE`. The ``source``
+              field of a sink is the handle of its source, or 0.
+    """
+    sources, sinks = _statsSnapshot()
+    return (
+        np.array(sources, dtype=SOURCE_DTYPE),
+        np.array(sinks, dtype=SINK_DTYPE),
+    )
+
+
+def snapshotDict() -> typing.Dict[str, typing.Dict[str, typing.Dict[str, typing.Any]]]:
+    """
+    Same as :func:`snapshot`, but returns dictionaries instead.
+
+    :returns: ``{"sources": {name: {field: value}}, "sinks": {...}}``
+    """
+    sources, sinks = _statsSnapshot()
+    return {
+        "sources": {s[1]: dict(zip(SOURCE_DTYPE.names, s)) for s in sources},
+        "sinks": {s[1]: dict(zip(SINK_DTYPE.names, s)) for s in sinks},
+    }
+
+
+class StatsPublisher:
+    """
+    Periodically publishes source and sink metrics to NetworkTables, under
+    ``/cscore/stats/sources/<name>`` and ``/cscore/stats/sinks/<name>``.
+    Only values that changed since the previous update are written.
+    """
+
+    def __init__(self, period: float = 1.0, *, ntinst=None):
+        """
+        :param period: How often to publish, in seconds. The cscore
+                       telemetry period is set to the same value.
+        :param ntinst: NetworkTables instance to publish to. If None, the
+                       default instance is used.
+        """
+        from ntcore import NetworkTableInstance
+
+        if ntinst is None:
+            ntinst = NetworkTableInstance.getDefault()
+
+        self.period = period
+        self.table = ntinst.getTable("cscore").getSubTable("stats")
+        self._last = {}
+
+        setTelemetryPeriod(period)
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="cscore-stats", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops publishing"""
+        self._stop.set()
+        self._thread.join()
+
+    def publish(self) -> None:
+        """Publishes the current metrics immediately"""
+        sources, sinks = _statsSnapshot()
+        self._publish("sources", SOURCE_DTYPE.names, sources)
+        self._publish("sinks", SINK_DTYPE.names, sinks)
+
+    def _publish(self, kind, names, rows) -> None:
+        table = self.table.getSubTable(kind)
+        last = self._last
+        for row in rows:
+            name = row[1]
+            sub = None
+            for field, value in zip(names, row):
+                if field == "name":
+                    continue
+                key = (kind, name, field)
+                if last.get(key) == value:
+                    continue
+                last[key] = value
+
+                if sub is None:
+                    sub = table.getSubTable(name)
+                if isinstance(value, bool):
+                    sub.putBoolean(field, value)
+                else:
+                    sub.putNumber(field, value)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.period):
+            try:
+                self.publish()
+            except Exception:
+                logger.exception("Error publishing cscore stats")
@@ -0,0 +1,164 @@
+"""
+Matches up frames from several cameras by capture time, for stereo and
+multi-view processing::
+
+    sync = FrameSynchronizer([left_sink, right_sink], tolerance=0.005)
+
+    while True:
+        times, (left, right) = sync.get()
+        if times is None:
+            continue
+        ..
+"""
+
+import collections
+import threading
+import typing
+
+import numpy as np
+
+import logging
+
+from ._cscore import CvSink
+
+logger = logging.getLogger("cscore.sync")
+
+
+class FrameSynchronizer:
+    """
+    Grabs frames from several sinks on background threads, keeps the most
+    recent few frames of each, and emits a tuple of frames whenever there is
+    one frame from every sink and their frame times are all within
+    ``tolerance`` of each other.
+
+    Frames are matched oldest first. A frame that can no longer be matched
+    is discarded and counted in :attr:`unmatched`. The frame is discarded
+    when another sink already has an older frame that is more than
+    ``tolerance`` newer than it.
+
+    Images are read-only. Copy them if you need to modify them.
+    """
+
+    def __init__(
+        self,
+        sinks: typing.Sequence[CvSink],
+        *,
+        tolerance: float = 0.010,
+        depth: int = 4,
+        queue_size: int = 2,
+        timeout: float = 0.225,
+    ):
+        """
+        :param sinks:      Sinks to synchronize, each attached to a source
+        :param tolerance:  Maximum difference between the frame times of a
+                           matched tuple, in seconds
+        :param depth:      Number of unmatched frames to keep per sink
+        :param queue_size: Number of matched tuples waiting for :meth:`get`.
+                           When full, the oldest tuple is dropped.
+        :param timeout:    Frame retrieval timeout in seconds
+        """
+        if len(sinks) < 2:
+            raise ValueError("at least two sinks are required")
+        if depth < 1 or queue_size < 1:
+            raise ValueError("depth and queue_size must be at least 1")
+
+        self.sinks = list(sinks)
+        self.tolerance = tolerance
+        self.depth = depth
+        self.timeout = timeout
+
+        #: Number of tuples emitted
+        self.matched = 0
+        #: Number of frames discarded because no match was possible
+        self.unmatched = 0
+        #: Number of frames discarded because a buffer or the queue was full
+        self.dropped = 0
+
+        self._tolerance_us = int(tolerance * 1000000)
+        self._cond = threading.Condition()
+        self._buffers = [collections.deque() for _ in self.sinks]
+        self._queue = collections.deque(maxlen=queue_size)
+
+        self._running = True
+        self._threads = [
+            threading.Thread(
+                target=self._run, args=(i, sink), name="sync-%d" % i, daemon=True
+            )
+            for i, sink in enumerate(self.sinks)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def get(self, timeout: typing.Optional[float] = None) -> typing.Tuple[
+        typing.Optional[typing.Tuple[int, ...]],
+        typing.Optional[typing.Tuple[np.ndarray, ...]],
+    ]:
+        """
+        Waits for the next matched tuple of frames.
+
+        :param timeout: Seconds to wait, or None to wait forever
+
+        :returns: Tuple of frame times and images, in the same order as the
+                  sinks. (None, None) on timeout or if stopped.
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._queue or not self._running, timeout
+            ):
+                return None, None
+            if not self._queue:
+                return None, None
+            return self._queue.popleft()
+
+    def stop(self) -> None:
+        """Stops the grab threads and wakes up :meth:`get`"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def _add(self, i: int, t: int, img: np.ndarray) -> None:
+        # must be called with the lock held
+        buf = self._buffers[i]
+        buf.append((t, img))
+        if len(buf) > self.depth:
+            buf.popleft()
+            self.dropped += 1
+
+        buffers = self._buffers
+        while all(buffers):
+            heads = [b[0][0] for b in buffers]
+            newest = max(heads)
+            oldest = min(heads)
+
+            if newest - oldest <= self._tolerance_us:
+                frames = [b.popleft() for b in buffers]
+                if len(self._queue) == self._queue.maxlen:
+                    self.dropped += len(frames)
+                self._queue.append(
+                    (tuple(f[0] for f in frames), tuple(f[1] for f in frames))
+                )
+                self.matched += 1
+                self._cond.notify_all()
+                continue
+
+            # frames only get newer, so the oldest head can't match anymore
+            buffers[heads.index(oldest)].popleft()
+            self.unmatched += 1
+
+    def _run(self, i: int, sink: CvSink) -> None:
+        empty = np.empty((0, 0, 3), dtype=np.uint8)
+
+        while self._running:
+            # each frame gets its own buffer, see FrameBroadcaster
+            t, img = sink.grabFrameInto(empty, self.timeout)
+            if t == 0:
+                continue
+
+            img.setflags(write=False)
+
+            with self._cond:
+                self._add(i, t, img)
+
+        logger.debug("Sync thread %d exited", i)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+#
+# Benchmarks for the frame path that don't need a camera. Results are
+# compared against a JSON baseline, and the script exits with an error
+# if any of them regress by more than the threshold.
+#
+#   python benchmarks.py --save      # record a baseline on this machine
+#   python benchmarks.py             # compare against it
+#
+# The committed benchmark_baseline.json holds loose limits that any CI
+# machine should meet, so that only large regressions fail. To run the
+# comparison as part of the test suite (for example in CI):
+#
+#   CSCORE_BENCHMARKS=1 python run_tests.py
+#
+
+import argparse
+import json
+import os
+from os.path import abspath, dirname, join
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+from ntcore import _now
+
+import cscore as cs
+
+RESOLUTIONS = [(160, 120), (320, 240), (640, 480), (1280, 720)]
+
+default_baseline = join(abspath(dirname(__file__)), "benchmark_baseline.json")
+
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    return float(np.percentile(values, p))
+
+
+class _Producer:
+    """Puts frames into a source as fast as possible"""
+
+    def __init__(self, source, img):
+        self.source = source
+        self.img = img
+        self.put_times = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        perf_counter = time.perf_counter
+        while not self._stop.is_set():
+            start = perf_counter()
+            self.source.putFrame(self.img)
+            self.put_times.append(perf_counter() - start)
+            # give the consumer a chance to grab each frame
+            time.sleep(0.0005)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def bench_roundtrip(w, h, duration):
+    """CvSource -> CvSink, with the copying grabFrame and with grabFrameInto"""
+    source = cs.CvSource("bench%dx%d" % (w, h), cs.VideoMode.PixelFormat.kBGR, w, h, 30)
+    sink = cs.CvSink("bench%dx%d" % (w, h))
+    sink.setSource(source)
+
+    img = np.random.randint(0, 255, (h, w, 3), dtype=np.uint8)
+    producer = _Producer(source, img)
+
+    results = {}
+    try:
+        for name, grab in (
+            ("grabFrame", sink.grabFrame),
+            ("grabFrameInto", sink.grabFrameInto),
+        ):
+            buf = np.zeros((h, w, 3), dtype=np.uint8)
+            latencies = []
+            grab_times = []
+            frames = 0
+
+            end = time.monotonic() + duration
+            while time.monotonic() < end:
+                start = time.perf_counter()
+                t, buf = grab(buf, 1.0)
+                elapsed = time.perf_counter() - start
+                if t == 0:
+                    continue
+                latencies.append((_now() - t) / 1000.0)
+                grab_times.append(elapsed * 1000.0)
+                frames += 1
+
+            results["%s_fps" % name] = frames / duration
+            results["%s_latency_p50_ms" % name] = _percentile(latencies, 50)
+            results["%s_latency_p95_ms" % name] = _percentile(latencies, 95)
+    finally:
+        producer.stop()
+
+    put_ms = [t * 1000.0 for t in producer.put_times]
+    results["putFrame_p50_ms"] = _percentile(put_ms, 50)
+    return results
+
+
+def bench_conversion(w, h, iterations):
+    """
+    Cost of converting between numpy arrays and cv::Mat, with the same
+    preallocated array on every call versus a fresh one.
+
+    Grab times are measured from the frame time, which is taken when the
+    frame is put, to when the grab returns. That leaves out the time spent
+    waiting for the producer to put the next frame.
+    """
+    name = "conv%dx%d" % (w, h)
+    source = cs.CvSource(name, cs.VideoMode.PixelFormat.kBGR, w, h, 30)
+    sink = cs.CvSink(name)
+    sink.setSource(source)
+    img = np.random.randint(0, 255, (h, w, 3), dtype=np.uint8)
+
+    results = {}
+
+    # numpy -> cv::Mat
+    for kind, make in (("prealloc", lambda: img), ("fresh", img.copy)):
+        put_ms = []
+        for _ in range(iterations):
+            frame = make()
+            start = time.perf_counter()
+            source.putFrame(frame)
+            put_ms.append((time.perf_counter() - start) * 1000.0)
+        results["putFrame_%s_p50_ms" % kind] = _percentile(put_ms, 50)
+
+    # cv::Mat -> numpy
+    producer = _Producer(source, img)
+    try:
+        buf = np.zeros((h, w, 3), dtype=np.uint8)
+        for kind, grab in (
+            ("prealloc", lambda: sink.grabFrameInto(buf, 1.0)),
+            ("fresh", lambda: sink.grabFrame(np.empty((0, 0, 3), np.uint8), 1.0)),
+        ):
+            grab_ms = []
+            while len(grab_ms) < iterations:
+                t, _ = grab()
+                returned = _now()
+                if t != 0:
+                    grab_ms.append((returned - t) / 1000.0)
+            results["grabFrame_%s_p50_ms" % kind] = _percentile(grab_ms, 50)
+    finally:
+        producer.stop()
+
+    return results
+
+
+def bench_imagewriter(w, h, duration, workers):
+    """Encode and write rate of ImageWriter"""
+    from cscore.imagewriter import ImageWriter
+
+    img = np.random.randint(0, 255, (h, w, 3), dtype=np.uint8)
+
+    with tempfile.TemporaryDirectory() as root:
+        writer = ImageWriter(
+            location_root=root,
+            capture_period=0,
+            workers=workers,
+            queue_size=workers * 2,
+        )
+
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            writer.setImage(img)
+            time.sleep(0.001)
+
+        written = writer.written
+        bytes_written = writer.bytes_written
+        writer.close()
+
+    return {
+        "written_fps": written / duration,
+        "bytes_per_sec": bytes_written / duration,
+    }
+
+
+def bench_mjpeg(w, h, duration, clients):
+    """MjpegServer streaming to local HTTP clients"""
+    from cscore import loadtest
+
+    results, cpu = loadtest.run(
+        clients, [""], width=w, height=h, fps=1000, duration=duration
+    )
+
+    fps = [r.fps for r in results]
+    return {
+        "client_fps_min": min(fps),
+        "client_fps_avg": sum(fps) / len(fps),
+        "client_latency_p50_ms": sum(r.latency(50) for r in results) / len(results),
+        # cpu is a percentage of one core, convert to ms of cpu per frame
+        "server_cpu_per_frame_ms": 10.0 * cpu / max(sum(fps), 1),
+    }
+
+
+def run_all(duration):
+    results = {}
+
+    for w, h in RESOLUTIONS:
+        for k, v in bench_roundtrip(w, h, duration).items():
+            results["roundtrip_%dx%d_%s" % (w, h, k)] = v
+
+    for w, h in RESOLUTIONS:
+        for k, v in bench_conversion(w, h, 200).items():
+            results["conversion_%dx%d_%s" % (w, h, k)] = v
+
+    for workers in (1, 2):
+        for k, v in bench_imagewriter(640, 480, duration, workers).items():
+            results["imagewriter_%dworkers_%s" % (workers, k)] = v
+
+    for clients in (1, 4):
+        for k, v in bench_mjpeg(320, 240, duration, clients).items():
+            results["mjpeg_%dclients_%s" % (clients, k)] = v
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns a list of regressions. Metrics ending in _ms are lower is
+    better, everything else is higher is better.
+    """
+    regressions = []
+    for key, base in sorted(baseline.items()):
+        if key not in results or base == 0:
+            continue
+        value = results[key]
+        if key.endswith("_ms"):
+            regressed = value > base * (1 + threshold)
+        else:
+            regressed = value < base * (1 - threshold)
+        if regressed:
+            regressions.append("%s: %.3f (baseline %.3f)" % (key, value, base))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", default=default_baseline)
+    parser.add_argument(
+        "--save", action="store_true", help="Save results as the new baseline"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=2.0, help="Seconds per benchmark"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed regression as a fraction of the baseline",
+    )
+    parser.add_argument("--output", help="Also write results to this file")
+    args = parser.parse_args()
+
+    results = run_all(args.duration)
+    for key, value in sorted(results.items()):
+        print("%-50s %12.3f" % (key, value))
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+
+    if args.save:
+        with open(args.baseline, "w") as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+        print("Baseline saved to", args.baseline)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline at %s, run with --save to create one" % args.baseline)
+        return 0
+
+    with open(args.baseline) as fp:
+        baseline = json.load(fp)
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("Regressions:")
+        for r in regressions:
+            print("  " + r)
+        return 1
+
+    print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
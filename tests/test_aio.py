@@ -0,0 +1,98 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import numpy as np
+
+import cscore as cs
+from cscore.aio import AsyncCvSink
+
+w, h = 32, 24
+
+
+def _source_and_sink(name):
+    source = cs.CvSource(name, cs.VideoMode.PixelFormat.kBGR, w, h, 30)
+    sink = cs.CvSink(name)
+    sink.setSource(source)
+    return source, sink
+
+
+def _produce(source, stop):
+    i = 0
+    while not stop.is_set():
+        i += 1
+        source.putFrame(np.full((h, w, 3), i % 256, dtype=np.uint8))
+        time.sleep(0.005)
+
+
+def _run_with_producer(source, coro):
+    stop = threading.Event()
+    th = threading.Thread(target=_produce, args=(source, stop), daemon=True)
+    th.start()
+    try:
+        return asyncio.run(coro)
+    finally:
+        stop.set()
+        th.join()
+
+
+def test_aio_grab():
+    source, sink = _source_and_sink("aio")
+    t, img = _run_with_producer(source, AsyncCvSink(sink).grab(timeout=1.0))
+    assert t != 0
+    assert img.shape == (h, w, 3)
+    assert (img == img[0, 0, 0]).all()
+
+
+def test_aio_grab_timeout():
+    _, sink = _source_and_sink("aio")
+    t, _ = asyncio.run(AsyncCvSink(sink).grab(timeout=0.05))
+    assert t == 0
+
+
+def test_aio_frames():
+    source, sink = _source_and_sink("aio")
+    buf = np.zeros((h, w, 3), dtype=np.uint8)
+
+    async def _collect():
+        times = []
+        async for t, img in AsyncCvSink(sink).frames(buf, timeout=1.0):
+            # the buffer is reused for every frame
+            assert img is buf
+            times.append(t)
+            if len(times) == 3:
+                break
+        return times
+
+    times = _run_with_producer(source, _collect())
+    assert times == sorted(set(times))
+
+
+def test_aio_shared_executor():
+    pairs = [_source_and_sink("aio%d" % i) for i in range(3)]
+
+    async def _grab_all(executor):
+        return await asyncio.gather(
+            *(
+                AsyncCvSink(sink, executor=executor).grab(timeout=1.0)
+                for _, sink in pairs
+            )
+        )
+
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=_produce, args=(source, stop), daemon=True)
+        for source, _ in pairs
+    ]
+    for th in threads:
+        th.start()
+    try:
+        with concurrent.futures.ThreadPoolExecutor(len(pairs)) as executor:
+            results = asyncio.run(_grab_all(executor))
+    finally:
+        stop.set()
+        for th in threads:
+            th.join()
+
+    assert all(t != 0 for t, _ in results)
@@ -0,0 +1,35 @@
+import json
+import os
+
+import pytest
+
+import benchmarks
+
+
+def test_compare_direction():
+    baseline = {"a_fps": 100.0, "a_latency_p50_ms": 10.0}
+
+    assert (
+        benchmarks.compare({"a_fps": 90.0, "a_latency_p50_ms": 11.0}, baseline, 0.2)
+        == []
+    )
+    # fewer frames is worse
+    assert len(benchmarks.compare({"a_fps": 70.0}, baseline, 0.2)) == 1
+    # more time is worse, less time is better
+    assert len(benchmarks.compare({"a_latency_p50_ms": 13.0}, baseline, 0.2)) == 1
+    assert benchmarks.compare({"a_latency_p50_ms": 1.0}, baseline, 0.2) == []
+
+
+@pytest.mark.skipif(
+    not os.environ.get("CSCORE_BENCHMARKS"),
+    reason="set CSCORE_BENCHMARKS=1 to run the benchmarks",
+)
+def test_benchmarks_baseline():
+    with open(benchmarks.default_baseline) as fp:
+        baseline = json.load(fp)
+
+    results = benchmarks.run_all(1.0)
+
+    # a metric that is no longer measured can't regress unnoticed
+    assert sorted(set(baseline) - set(results)) == []
+    assert benchmarks.compare(results, baseline, 0.2) == []
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import cscore as cs
+from cscore.broadcast import FrameBroadcaster
+
+w, h = 32, 24
+
+
+class _Producer:
+    """Puts frames whose pixels are the frame number"""
+
+    def __init__(self, source, period=0.01):
+        self.source = source
+        self.period = period
+        self.count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.count += 1
+            img = np.full((h, w, 3), self.count % 256, dtype=np.uint8)
+            self.source.putFrame(img)
+            time.sleep(self.period)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        # let the broadcaster receive the last frame
+        time.sleep(0.2)
+
+
+@pytest.fixture
+def broadcaster():
+    source = cs.CvSource("broadcast", cs.VideoMode.PixelFormat.kBGR, w, h, 30)
+    b = FrameBroadcaster(source)
+    yield b
+    b.stop()
+
+
+def test_broadcast_shared(broadcaster):
+    sub1 = broadcaster.subscribe()
+    sub2 = broadcaster.subscribe()
+    assert broadcaster.subscribers == 2
+
+    producer = _Producer(broadcaster.source)
+    time.sleep(0.1)
+    producer.stop()
+
+    t1, img1 = sub1.poll()
+    t2, img2 = sub2.poll()
+    assert t1 != 0 and t1 == t2
+    assert img1 is img2
+    assert not img1.flags.writeable
+    assert (img1 == producer.count % 256).all()
+
+    sub2.close()
+    assert broadcaster.subscribers == 1
+
+
+def test_broadcast_slow_subscriber(broadcaster):
+    sub = broadcaster.subscribe()
+    producer = _Producer(broadcaster.source)
+    try:
+        t1, img1 = sub.get(1.0)
+        assert img1 is not None
+        # fall behind by many frames
+        time.sleep(0.2)
+    finally:
+        producer.stop()
+
+    t2, img2 = sub.get(1.0)
+    assert t2 > t1
+    # the latest frame, not the one after the first
+    assert int(img2[0, 0, 0]) == producer.count % 256
+    assert int(img2[0, 0, 0]) - int(img1[0, 0, 0]) > 1
+
+    # and no backlog
+    assert sub.poll() == (0, None)
+
+
+def test_broadcast_timeout(broadcaster):
+    sub = broadcaster.subscribe()
+    assert sub.poll() == (0, None)
+
+    start = time.monotonic()
+    assert sub.get(0.1) == (0, None)
+    assert 0.1 <= time.monotonic() - start < 1.0
+
+
+def test_broadcast_stop_wakes_subscribers():
+    source = cs.CvSource("broadcast", cs.VideoMode.PixelFormat.kBGR, w, h, 30)
+    broadcaster = FrameBroadcaster(source)
+    sub = broadcaster.subscribe()
+
+    results = []
+    th = threading.Thread(target=lambda: results.append(sub.get()), daemon=True)
+    th.start()
+    time.sleep(0.05)
+
+    broadcaster.stop()
+    th.join(1.0)
+    assert not th.is_alive()
+    assert results == [(0, None)]
+
+
+def test_broadcast_encoded(broadcaster):
+    cv2 = pytest.importorskip("cv2")
+
+    sub1 = broadcaster.subscribe()
+    sub2 = broadcaster.subscribe()
+
+    producer = _Producer(broadcaster.source)
+    time.sleep(0.1)
+    producer.stop()
+
+    t1, data1 = sub1.getEncoded(quality=50, timeout=1.0)
+    t2, data2 = sub2.getEncoded(quality=50, timeout=1.0)
+    assert t1 != 0 and t1 == t2
+    # encoded once, shared by both
+    assert data1 is data2
+    assert broadcaster.encodeCache.misses == 1
+    assert broadcaster.encodeCache.hits == 1
+
+    img = cv2.imdecode(data1, cv2.IMREAD_COLOR)
+    assert img.shape == (h, w, 3)
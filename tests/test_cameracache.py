@@ -0,0 +1,56 @@
+import json
+
+from cscore.cameracache import CameraCache
+
+
+def _entry(path, dev, vid, pid):
+    return {
+        "info": {
+            "dev": dev,
+            "path": path,
+            "name": "cam",
+            "otherPaths": [],
+            "vendorId": vid,
+            "productId": pid,
+        },
+        "modes": [[1, 320, 240, 30]],
+        "config": '{"fps": 30}',
+    }
+
+
+def test_cameracache_lookup(tmp_path):
+    present = tmp_path / "usb-0"
+    present.write_text("")
+    missing = str(tmp_path / "usb-1")
+
+    fname = tmp_path / "cameras.json"
+    fname.write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "cameras": {
+                    str(present): _entry(str(present), 0, 0x46D, 0x825),
+                    missing: _entry(missing, 1, 0x46D, 0x826),
+                },
+            }
+        )
+    )
+
+    cache = CameraCache(str(fname))
+    assert cache.find(dev=0)["config"] == '{"fps": 30}'
+    assert cache.find(path=str(present)) is not None
+    # path of the camera no longer exists
+    assert cache.find(dev=1) is None
+
+    assert cache.findUsbId(0x46D, 0x826)["info"]["dev"] == 1
+    assert cache.findUsbId(0x46D, 0x999) is None
+
+    cache.save()
+    assert CameraCache(str(fname)).find(dev=0) is not None
+
+
+def test_cameracache_bad_file(tmp_path):
+    fname = tmp_path / "cameras.json"
+    fname.write_text("not json")
+    assert CameraCache(str(fname)).find(dev=0) is None
+    assert CameraCache(str(tmp_path / "missing.json")).find(dev=0) is None
@@ -1,3 +1,6 @@
+import threading
+import time
+
 import cscore as cs
 import numpy as np
 
@@ -7,3 +10,221 @@ def test_empty_img():
     sink = cs.CvSink("something")
     _, rimg = sink.grabFrame(img)
     assert (rimg == img).all()
+
+
+def _put_frames(source, img, stop):
+    while not stop.is_set():
+        source.putFrame(img)
+        time.sleep(0.005)
+
+
+def test_grab_frame_into_no_realloc():
+    w, h = 160, 120
+    source = cs.CvSource("src", cs.VideoMode.PixelFormat.kBGR, w, h, 30)
+    sink = cs.CvSink("sink")
+    sink.setSource(source)
+
+    frame = np.full((h, w, 3), 42, dtype=np.uint8)
+    stop = threading.Event()
+    th = threading.Thread(target=_put_frames, args=(source, frame, stop), daemon=True)
+    th.start()
+
+    try:
+        buf = np.zeros((h, w, 3), dtype=np.uint8)
+        ptr = buf.ctypes.data
+        t, rimg = sink.grabFrameInto(buf, 1.0)
+        assert t != 0
+        assert rimg is buf
+        assert rimg.ctypes.data == ptr
+        assert (buf == 42).all()
+    finally:
+        stop.set()
+        th.join()
+
+
+def test_grab_frame_into_empty():
+    img = np.zeros(shape=(0, 0, 3), dtype=np.uint8)
+    sink = cs.CvSink("something")
+    t, rimg = sink.grabFrameInto(img, 0.01)
+    assert t == 0
+    assert rimg is img
+
+
+def test_put_frames():
+    w, h = 160, 120
+    sources = [
+        cs.CvSource("src%d" % i, cs.VideoMode.PixelFormat.kBGR, w, h, 30)
+        for i in range(2)
+    ]
+    sinks = []
+    for i, source in enumerate(sources):
+        sink = cs.CvSink("sink%d" % i)
+        sink.setSource(source)
+        sinks.append(sink)
+
+    frames = [np.full((h, w, 3), 50 * (i + 1), dtype=np.uint8) for i in range(2)]
+
+    stop = threading.Event()
+
+    def _put():
+        while not stop.is_set():
+            cs.CvSource.putFrames(list(zip(sources, frames)))
+            time.sleep(0.005)
+
+    th = threading.Thread(target=_put, daemon=True)
+    th.start()
+
+    try:
+        for sink, frame in zip(sinks, frames):
+            t, img = sink.grabFrame(np.zeros((h, w, 3), dtype=np.uint8), 1.0)
+            assert t != 0, sink.getError()
+            assert (img == frame).all()
+    finally:
+        stop.set()
+        th.join()
+
+    cs.CvSource.putFrames([])
+
+
+def test_raw_sink_timeout():
+    sink = cs.RawSink("something")
+    t, img, mode = sink.grabFrame(timeout=0.01)
+    assert t == 0
+    assert img is None
+
+
+def test_raw_sink_grab():
+    w, h = 160, 120
+    source = cs.CvSource("src", cs.VideoMode.PixelFormat.kBGR, w, h, 30)
+    sink = cs.RawSink("sink")
+    sink.setSource(source)
+
+    frame = np.zeros((h, w, 3), dtype=np.uint8)
+    frame[:, :, 0] = 10
+    frame[:, :, 1] = 20
+    frame[:, :, 2] = 30
+
+    stop = threading.Event()
+    th = threading.Thread(target=_put_frames, args=(source, frame, stop), daemon=True)
+    th.start()
+
+    try:
+        t, img, mode = sink.grabFrame(cs.VideoMode.PixelFormat.kBGR, timeout=1.0)
+        assert t != 0
+        assert mode.pixelFormat == cs.VideoMode.PixelFormat.kBGR
+        assert (mode.width, mode.height) == (w, h)
+        assert img.shape == (h, w, 3)
+        assert (img == frame).all()
+
+        t, img, mode = sink.grabFrame(cs.VideoMode.PixelFormat.kGray, timeout=1.0)
+        assert t != 0
+        assert mode.pixelFormat == cs.VideoMode.PixelFormat.kGray
+        assert img.shape == (h, w)
+        # all pixels are the same color, so they convert to the same gray
+        assert (img == img[0, 0]).all()
+        assert 10 <= img[0, 0] <= 30
+    finally:
+        stop.set()
+        th.join()
+
+
+def test_put_encoded_frame():
+    w, h = 160, 120
+    source = cs.RawSource("src", cs.VideoMode.PixelFormat.kMJPEG, w, h, 30)
+    sink = cs.RawSink("sink")
+    sink.setSource(source)
+
+    # not decoded when grabbed as kMJPEG, so the contents don't matter
+    data = b"\xff\xd8" + bytes(range(256)) + b"\xff\xd9"
+
+    stop = threading.Event()
+
+    def _put():
+        while not stop.is_set():
+            source.putEncodedFrame(data, w, h)
+            time.sleep(0.005)
+
+    th = threading.Thread(target=_put, daemon=True)
+    th.start()
+
+    try:
+        t, img, mode = sink.grabFrame(cs.VideoMode.PixelFormat.kMJPEG, timeout=1.0)
+        assert t != 0
+        assert mode.pixelFormat == cs.VideoMode.PixelFormat.kMJPEG
+        assert img.tobytes() == data
+
+        # a CvSink attached to the same source sees the same mode
+        cvsink = cs.CvSink("cvsink")
+        cvsink.setSource(source)
+        assert cvsink.getSource().getVideoMode().pixelFormat == (
+            cs.VideoMode.PixelFormat.kMJPEG
+        )
+    finally:
+        stop.set()
+        th.join()
+
+
+def test_raw_source_put_frame():
+    w, h = 16, 12
+    source = cs.RawSource("rawsrc", cs.VideoMode.PixelFormat.kGray, w, h, 30)
+    sink = cs.RawSink("rawsink")
+    sink.setSource(source)
+
+    frame = np.arange(w * h, dtype=np.uint8).reshape(h, w)
+    stop = threading.Event()
+
+    def _put():
+        while not stop.is_set():
+            source.putFrame(frame, cs.VideoMode.PixelFormat.kGray, w, h)
+            time.sleep(0.005)
+
+    th = threading.Thread(target=_put, daemon=True)
+    th.start()
+
+    try:
+        t, img, mode = sink.grabFrame(cs.VideoMode.PixelFormat.kGray, timeout=1.0)
+        assert t != 0
+        assert (img == frame).all()
+    finally:
+        stop.set()
+        th.join()
+
+
+def test_grab_frames():
+    w, h = 160, 120
+    sources = [
+        cs.CvSource("src%d" % i, cs.VideoMode.PixelFormat.kBGR, w, h, 30)
+        for i in range(2)
+    ]
+    # a frame of a different size can't be written into the batch
+    small = cs.CvSource("small", cs.VideoMode.PixelFormat.kBGR, w // 2, h // 2, 30)
+    sources.append(small)
+
+    sinks = []
+    for source in sources:
+        sink = cs.CvSink("sink" + source.getName())
+        sink.setSource(source)
+        sinks.append(sink)
+
+    stop = threading.Event()
+    threads = []
+    for i, source in enumerate(sources):
+        mode = source.getVideoMode()
+        img = np.full((mode.height, mode.width, 3), 10 * (i + 1), dtype=np.uint8)
+        th = threading.Thread(target=_put_frames, args=(source, img, stop), daemon=True)
+        th.start()
+        threads.append(th)
+
+    try:
+        out = np.zeros((3, h, w, 3), dtype=np.uint8)
+        times, valid = cs.CvSink.grabFrames(sinks, out, 1.0)
+        assert times.dtype == np.uint64
+        assert list(valid) == [True, True, False]
+        assert times[0] != 0 and times[1] != 0 and times[2] == 0
+        assert (out[0] == 10).all()
+        assert (out[1] == 20).all()
+        assert (out[2] == 0).all()
+    finally:
+        stop.set()
+        for th in threads:
+            th.join()
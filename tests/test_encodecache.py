@@ -0,0 +1,70 @@
+import threading
+
+import numpy as np
+
+from cscore.encodecache import EncodeCache
+
+
+class _CountingCache(EncodeCache):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.encoded = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def _encode(self, image, width, height, quality):
+        self.gate.wait()
+        self.encoded.append((width, height, quality))
+        return np.array([width, height, quality], dtype=np.uint16)
+
+
+def test_encodecache_hits():
+    cache = _CountingCache()
+    img = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    a = cache.encode("cam", 1, img, quality=50)
+    b = cache.encode("cam", 1, img, quality=50)
+    assert a is b
+    assert cache.encoded == [(160, 120, 50)]
+
+    # any differing key component encodes again
+    cache.encode("cam", 1, img, quality=30)
+    cache.encode("cam", 1, img, quality=50, width=80, height=60)
+    cache.encode("cam", 2, img, quality=50)
+    cache.encode("other", 1, img, quality=50)
+    assert len(cache.encoded) == 5
+
+    assert cache.getStats() == {"hits": 1, "misses": 5, "entries": 5}
+
+
+def test_encodecache_maxsize():
+    cache = _CountingCache(maxsize=2)
+    img = np.zeros((12, 16, 3), dtype=np.uint8)
+
+    for t in range(5):
+        cache.encode("cam", t, img)
+    assert cache.getStats()["entries"] == 2
+
+    cache.encode("cam", 0, img)
+    assert cache.misses == 6
+
+
+def test_encodecache_concurrent():
+    cache = _CountingCache()
+    cache.gate.clear()
+    img = np.zeros((12, 16, 3), dtype=np.uint8)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.encode("cam", 1, img)))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    cache.gate.set()
+    for t in threads:
+        t.join()
+
+    assert len(cache.encoded) == 1
+    assert len(results) == 4
+    assert all(r is results[0] for r in results)
@@ -0,0 +1,19 @@
+import cscore as cs
+
+
+def test_event_poller():
+    with cs.VideoEventPoller(cs.VideoEventPoller.kSourceCreated) as poller:
+        source = cs.CvSource("evsrc", cs.VideoMode.PixelFormat.kBGR, 160, 120, 30)
+
+        events = poller.poll(1.0)
+        assert events
+        kind, handle, _, _, name, _, _, mode = events[0]
+        assert kind == cs.VideoEventPoller.kSourceCreated
+        assert handle == source.getHandle()
+        assert name == "evsrc"
+        assert mode is None
+
+
+def test_event_poller_timeout():
+    with cs.VideoEventPoller(cs.VideoEventPoller.kUsbCamerasChanged) as poller:
+        assert poller.poll(0.01) == []
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import cscore as cs
+import numpy as np
+
+from cscore.framepool import FramePool
+
+
+def test_framepool_grab():
+    w, h = 160, 120
+    source = cs.CvSource("src", cs.VideoMode.PixelFormat.kBGR, w, h, 30)
+    sink = cs.CvSink("sink")
+    sink.setSource(source)
+
+    img = np.full((h, w, 3), 7, dtype=np.uint8)
+    stop = threading.Event()
+
+    def _put():
+        while not stop.is_set():
+            source.putFrame(img)
+            time.sleep(0.005)
+
+    th = threading.Thread(target=_put, daemon=True)
+    th.start()
+
+    try:
+        pool = FramePool(sink, 2, (h, w, 3))
+        buffers = [id(b) for b in pool._buffers]
+
+        f1 = pool.grab(1.0)
+        f2 = pool.grab(1.0)
+        assert f1 is not None and f2 is not None
+        assert f1.seq == 1 and f2.seq == 2
+        assert f2.time > f1.time
+        assert pool.available == 0
+        assert pool.acquire(timeout=0) is None
+
+        assert id(f1.image) in buffers
+        assert (f1.image == 7).all()
+
+        f1.release()
+        with pool.grab(1.0) as f3:
+            assert f3.seq == 3
+            assert id(f3.image) in buffers
+        f2.release()
+        assert pool.available == 2
+    finally:
+        stop.set()
+        th.join()
+
+
+def test_framepool_dropped():
+    w, h = 32, 24
+    unknown = cs.CvSource("unknown", cs.VideoMode.PixelFormat.kBGR, w, h, 0)
+    source = cs.CvSource("fps30", cs.VideoMode.PixelFormat.kBGR, w, h, 30)
+    sink = cs.CvSink("sink")
+    sink.setSource(unknown)
+
+    img = np.zeros((h, w, 3), dtype=np.uint8)
+    stop = threading.Event()
+
+    def _put():
+        # much faster than the frames are grabbed
+        while not stop.is_set():
+            unknown.putFrame(img)
+            source.putFrame(img)
+            time.sleep(0.005)
+
+    th = threading.Thread(target=_put, daemon=True)
+    th.start()
+
+    def _grab(pool, count):
+        for _ in range(count):
+            frame = pool.grab(1.0)
+            assert frame is not None
+            frame.release()
+            time.sleep(0.1)
+
+    try:
+        pool = FramePool(sink, 1, (h, w, 3))
+
+        # nothing can be estimated without a framerate
+        _grab(pool, 3)
+        assert pool.dropped == 0
+
+        sink.setSource(source)
+        _grab(pool, 3)
+        # about two frames of the source are missed between grabs
+        assert pool.dropped >= 2
+    finally:
+        stop.set()
+        th.join()
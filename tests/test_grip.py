@@ -0,0 +1,40 @@
+from cscore.grip import StepTimer
+
+
+class GripPipeline:
+    """Shaped like the code GRIP generates for Python"""
+
+    def __init__(self):
+        self.blur_output = None
+        self.threshold_output = None
+
+    def process(self, source0):
+        self.blur_output = self.__blur(source0, 2)
+        self.threshold_output = self.__threshold(self.blur_output, 3)
+
+    @staticmethod
+    def __blur(src, radius):
+        return src + radius
+
+    @staticmethod
+    def __threshold(src, value):
+        return src > value
+
+
+def test_step_timer():
+    pipeline = GripPipeline()
+    timer = StepTimer(pipeline)
+
+    pipeline.process(1)
+    pipeline.process(2)
+    assert pipeline.blur_output == 4
+    assert pipeline.threshold_output is True
+
+    timings = timer.collect()
+    assert sorted(timings) == ["blur", "process", "threshold"]
+    for calls, avg, worst in timings.values():
+        assert calls == 2
+        assert 0 <= avg <= worst
+
+    # collect resets the timings
+    assert all(calls == 0 for calls, _, _ in timer.collect().values())
@@ -0,0 +1,274 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from cscore.imagewriter import ImageWriter
+
+
+def _wait_for(predicate, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.005)
+
+
+def _images(tmp_path):
+    (session,) = tmp_path.iterdir()
+    return [cv2.imread(str(f)) for f in sorted(session.iterdir())]
+
+
+class _GatedWriter(ImageWriter):
+    """Blocks encoding until the gate is opened"""
+
+    def __init__(self, **kwargs):
+        self.gate = threading.Event()
+        super().__init__(**kwargs)
+
+    def _encode(self, img):
+        self.gate.wait()
+        return super()._encode(img)
+
+
+@pytest.mark.parametrize(
+    "drop_policy, queued, values",
+    [("oldest", 4, [0, 100, 150]), ("newest", 3, [0, 50, 100])],
+)
+def test_imagewriter_drop_policy(tmp_path, drop_policy, queued, values):
+    writer = _GatedWriter(
+        location_root=str(tmp_path),
+        capture_period=0,
+        image_format="png",
+        queue_size=2,
+        drop_policy=drop_policy,
+    )
+    try:
+        for i in range(4):
+            writer.setImage(np.full((8, 8, 3), i * 50, dtype=np.uint8))
+            if i == 0:
+                # the worker is now stuck encoding the first image
+                _wait_for(lambda: writer.getStats()["pending"] == 0)
+            # images are named by their timestamp
+            time.sleep(0.02)
+
+        assert writer.queued == queued
+        assert writer.dropped == 1
+        assert writer.written == 0
+    finally:
+        writer.gate.set()
+        writer.close()
+
+    assert writer.written == 3
+    assert writer.dropped == 1
+    assert [int(img[0, 0, 0]) for img in _images(tmp_path)] == values
+
+
+@pytest.mark.parametrize("scale, shape", [(None, (48, 64, 3)), (0.5, (24, 32, 3))])
+def test_imagewriter_pretrigger(tmp_path, scale, shape):
+    writer = ImageWriter(
+        location_root=str(tmp_path),
+        capture_period=0,
+        image_format="png",
+        pretrigger=5.0,
+        pretrigger_scale=scale,
+    )
+    try:
+        for i in range(3):
+            writer.setImage(np.full((48, 64, 3), i * 50, dtype=np.uint8))
+            time.sleep(0.02)
+
+        _wait_for(lambda: writer.getStats()["buffered"] == 3)
+        assert writer.written == 0
+
+        writer.trigger()
+    finally:
+        writer.close()
+
+    assert writer.written == 3
+    images = _images(tmp_path)
+    assert [img.shape for img in images] == [shape] * 3
+    for i, img in enumerate(images):
+        assert (img == i * 50).all()
+
+
+def test_imagewriter_trigger_while_scaling(tmp_path, monkeypatch):
+    from cscore import imagewriter
+
+    writer = ImageWriter(
+        location_root=str(tmp_path),
+        capture_period=0,
+        image_format="png",
+        pretrigger=5.0,
+        pretrigger_scale=0.5,
+    )
+
+    class _TriggeringCv2:
+        def __getattr__(self, name):
+            return getattr(cv2, name)
+
+        def resize(self, *args, **kwargs):
+            writer.trigger()
+            return cv2.resize(*args, **kwargs)
+
+    monkeypatch.setattr(imagewriter, "cv2", _TriggeringCv2())
+
+    try:
+        writer.setImage(np.full((48, 64, 3), 100, dtype=np.uint8))
+        _wait_for(lambda: writer.written == 1)
+    finally:
+        writer.close()
+
+    # the full size image is written, not the one scaled for buffering
+    (img,) = _images(tmp_path)
+    assert img.shape == (48, 64, 3)
+
+
+def _session(root, name, size):
+    path = root / name
+    path.mkdir()
+    (path / "0.00.jpg").write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_disk_monitor_deletes_oldest(tmp_path):
+    from cscore.imagewriter import _DiskMonitor
+
+    oldest = _session(tmp_path, "2023-01-01 00.00.00", 100)
+    older = _session(tmp_path, "2023-01-02 00.00.00", 100)
+    current = _session(tmp_path, "2023-01-03 00.00.00", 100)
+    # not a session, so it is neither counted nor deleted
+    other = _session(tmp_path, "2022 photos", 1000)
+
+    disk = _DiskMonitor(str(tmp_path), 210, None, 0)
+    disk.check(current)
+
+    assert sorted(str(p) for p in tmp_path.iterdir()) == [other, older, current]
+    assert disk.sessions_deleted == 1
+    assert disk.used == 200
+    assert disk.state == "low"
+    assert disk.headroom == pytest.approx(10 / 21)
+
+    # the current session is never deleted
+    disk.max_bytes = 50
+    disk.check(current, force=True)
+    assert sorted(str(p) for p in tmp_path.iterdir()) == [other, current]
+    assert disk.state == "full"
+    assert disk.headroom == 0.0
+
+
+@pytest.mark.parametrize(
+    "max_bytes, min_free_bytes, state, headroom",
+    [(0, None, "full", 0.0), (None, 0, "ok", 1.0)],
+)
+def test_disk_monitor_zero_limits(tmp_path, max_bytes, min_free_bytes, state, headroom):
+    from cscore.imagewriter import _DiskMonitor
+
+    current = _session(tmp_path, "2023-01-01 00.00.00", 100)
+
+    disk = _DiskMonitor(str(tmp_path), max_bytes, min_free_bytes, 0)
+    disk.check(current)
+
+    assert disk.state == state
+    assert disk.headroom == headroom
+
+
+def test_imagewriter_headroom_scaling(tmp_path):
+    writer = ImageWriter(
+        location_root=str(tmp_path),
+        capture_period=0.5,
+        max_bytes=1024 * 1024,
+        jpeg_quality=90,
+        min_jpeg_quality=50,
+        max_period_scale=3.0,
+    )
+    try:
+        for headroom, quality, period in (
+            (1.0, 90, 0.5),
+            (0.5, 70, 1.0),
+            (0.0, 50, 1.5),
+        ):
+            writer._disk.headroom = headroom
+            stats = writer.getStats()
+            assert stats["jpeg_quality"] == quality
+            assert stats["capture_period"] == pytest.approx(period)
+    finally:
+        writer.close()
+
+
+def test_imagewriter_session_dir_error(tmp_path, monkeypatch):
+    from cscore import imagewriter
+
+    def makedirs(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(imagewriter.os, "makedirs", makedirs)
+
+    writer = ImageWriter(
+        location_root=str(tmp_path), capture_period=0, max_bytes=1024 * 1024
+    )
+    try:
+        img = np.zeros((8, 8, 3), dtype=np.uint8)
+        writer.setImage(img)
+        _wait_for(lambda: writer.write_errors == 1)
+        assert writer.active
+
+        # once there is space again, writing continues
+        monkeypatch.undo()
+        writer.setImage(img)
+        _wait_for(lambda: writer.written == 1)
+    finally:
+        writer.close()
+
+
+def test_imagewriter_disk_full(tmp_path):
+    writer = ImageWriter(location_root=str(tmp_path), capture_period=0, max_bytes=0)
+    try:
+        writer.setImage(np.zeros((8, 8, 3), dtype=np.uint8))
+        _wait_for(lambda: writer.disk_dropped == 1)
+    finally:
+        writer.close()
+
+    # not counted as a queue drop
+    stats = writer.getStats()
+    assert stats["dropped"] == 0
+    assert stats["disk_dropped"] == 1
+    assert stats["disk_state"] == "full"
+    assert writer.written == 0
+
+
+def test_imagewriter_chunks(tmp_path):
+    from cscore.recording import RecordingReader
+
+    writer = ImageWriter(
+        location_root=str(tmp_path), capture_period=0, image_format="png", chunk_size=1
+    )
+    bounds = []
+    try:
+        for i in range(5):
+            before = time.time()
+            writer.setImage(np.full((8, 8, 3), i * 50, dtype=np.uint8))
+            bounds.append((before, time.time()))
+            time.sleep(0.02)
+    finally:
+        writer.close()
+
+    assert writer.written == 5
+
+    (session,) = tmp_path.iterdir()
+    # every frame is bigger than the chunk size, so each gets its own chunk
+    assert len(list(session.glob("chunk-*.bin"))) == 5
+
+    reader = RecordingReader(str(session))
+    assert len(reader) == 5
+    for t, (before, after) in zip(reader.timestamps, bounds):
+        assert before <= t <= after
+
+    assert reader.seek(reader.timestamps[2]) == 2
+    assert reader.seek(reader.timestamps[2] + 0.001) == 3
+    assert reader.seek(bounds[-1][1] + 1) == 5
+
+    values = [int(img[0, 0, 0]) for _, img in reader.decode(reader.seek(bounds[1][0]))]
+    assert values == [50, 100, 150, 200]
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import numpy as np
+from ntcore import NetworkTableInstance
+
+import cscore as cs
+from cscore.latency import STAGES, LatencyHistogram, LatencyTracker
+
+
+def test_histogram_percentiles():
+    h = LatencyHistogram(bucket_us=100, buckets=100)
+    for us in range(0, 10000, 10):
+        h.record(us)
+
+    assert h.count == 1000
+    assert h.percentile(50) == 5.0
+    assert h.percentile(99) == 9.9
+
+    h.reset()
+    assert h.count == 0
+    assert h.percentile(50) == 0.0
+
+
+def test_histogram_overflow():
+    h = LatencyHistogram(bucket_us=100, buckets=10)
+    h.record(50)
+    h.record(250000)
+    assert h.percentile(99) == 250.0
+
+
+def test_tracker_instrumented():
+    source = cs.CvSource("latency", cs.VideoMode.PixelFormat.kBGR, 32, 24, 30)
+    ntinst = NetworkTableInstance.create()
+    tracker = LatencyTracker("test", publish_period=1000.0, ntinst=ntinst)
+
+    plain = cs.CvSink("latency")
+    plain.setSource(source)
+    sink = tracker.sink(plain)
+    output = tracker.source(
+        cs.CvSource("latency-out", cs.VideoMode.PixelFormat.kBGR, 32, 24, 30)
+    )
+
+    img = np.zeros((24, 32, 3), dtype=np.uint8)
+    stop = threading.Event()
+
+    def _put():
+        while not stop.is_set():
+            source.putFrame(img)
+            time.sleep(0.005)
+
+    th = threading.Thread(target=_put, daemon=True)
+    th.start()
+
+    try:
+        buf = np.zeros((24, 32, 3), dtype=np.uint8)
+        for _ in range(3):
+            t, buf = sink.grabFrameInto(buf, 1.0)
+            assert t != 0
+            output.putFrame(buf)
+    finally:
+        stop.set()
+        th.join()
+
+    # a frame that wasn't grabbed isn't recorded
+    output.putFrame(img)
+
+    for stage in STAGES:
+        assert tracker.histograms[stage].count == 3
+    assert tracker.histograms["total"].max_us > 0
+
+    # everything else is forwarded
+    assert sink.getName() == "latency"
+    assert output.getName() == "latency-out"
+
+    NetworkTableInstance.destroy(ntinst)
@@ -0,0 +1,36 @@
+import multiprocessing
+import time
+
+import pytest
+
+from cscore import loadtest
+
+
+def test_synthetic_frames():
+    frames = loadtest._synthetic_frames(32, 24, count=3)
+    assert len(frames) == 3
+    assert frames[0].shape == (24, 32, 3)
+    assert not (frames[0] == frames[1]).all()
+
+
+def test_loadtest_run():
+    results, cpu = loadtest.run(
+        2, ["", "compression=30"], width=160, height=120, duration=1.0
+    )
+
+    assert [r.query for r in results] == ["", "compression=30"]
+    for r in results:
+        assert r.error is None
+        assert r.frames > 0
+        assert r.bytes_per_sec > 0
+    assert cpu >= 0
+
+
+def test_client_process_exited():
+    ctx = multiprocessing.get_context("spawn")
+    result_queue = ctx.Queue()
+    proc = ctx.Process(target=time.sleep, args=(0,))
+    proc.start()
+
+    with pytest.raises(RuntimeError, match="exited with code 0"):
+        loadtest._wait_results(proc, result_queue, 30.0)
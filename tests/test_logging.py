@@ -0,0 +1,36 @@
+from cscore._logging import _RateLimiter
+
+
+def test_rate_limiter_bucket():
+    limiter = _RateLimiter(rate=2.0, burst=3)
+    site = ("source.cpp", 10)
+
+    # the burst is allowed at once
+    assert [limiter.allow(site, 1, 0.0) for _ in range(3)] == [(True, 0)] * 3
+    assert limiter.allow(site, 1, 0.0) == (False, 0)
+    # collapsed repeats count as several suppressed messages
+    assert limiter.allow(site, 3, 0.0) == (False, 0)
+
+    # half a token isn't enough
+    assert limiter.allow(site, 1, 0.25) == (False, 0)
+    # a full token is, and reports what was suppressed since the last one
+    assert limiter.allow(site, 1, 0.5) == (True, 5)
+    assert limiter.allow(site, 1, 0.5) == (False, 0)
+
+    # tokens never exceed the burst
+    assert [limiter.allow(site, 1, 100.0) for _ in range(4)] == [
+        (True, 1),
+        (True, 0),
+        (True, 0),
+        (False, 0),
+    ]
+
+
+def test_rate_limiter_sites():
+    limiter = _RateLimiter(rate=1.0, burst=1)
+
+    assert limiter.allow(("a.cpp", 1), 1, 0.0) == (True, 0)
+    assert limiter.allow(("a.cpp", 1), 1, 0.0) == (False, 0)
+    # each site has its own bucket
+    assert limiter.allow(("a.cpp", 2), 1, 0.0) == (True, 0)
+    assert limiter.allow(("b.cpp", 1), 1, 0.0) == (True, 0)
@@ -0,0 +1,50 @@
+import concurrent.futures
+import time
+
+import cscore as cs
+
+from cscore.framepool import FramePool
+from cscore.parallel import ParallelRunner, _init_worker, _process
+
+
+class _Delay:
+    """Takes as many hundredths of a second as the value of the image"""
+
+    def process(self, img):
+        time.sleep(img[0, 0, 0] / 100.0)
+        return img
+
+
+class _RecordingRunner(ParallelRunner):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.order = []
+
+    def _publish(self, future, frame, start, grabbed):
+        self.order.append(frame.seq)
+        super()._publish(future, frame, start, grabbed)
+
+
+def test_parallel_reorder():
+    runner = _RecordingRunner(_Delay, 3)
+    runner._output = cs.CvSource("parallel", cs.VideoMode.PixelFormat.kBGR, 4, 4, 30)
+    pool = FramePool(cs.CvSink("parallel"), 3, (4, 4, 3))
+
+    with concurrent.futures.ThreadPoolExecutor(
+        3, initializer=_init_worker, initargs=(runner.pipeline,)
+    ) as executor:
+        # the last frame finishes first, the first frame last
+        for seq, delay in enumerate((20, 10, 0), 1):
+            frame = pool.acquire()
+            frame.seq = seq
+            frame.image[:] = delay
+            future = executor.submit(_process, frame.image)
+            future.add_done_callback(
+                lambda f, frame=frame: runner._on_done(f, frame, time.monotonic(), 0)
+            )
+
+    assert runner.order == [1, 2, 3]
+    assert runner.published == 3
+    assert runner.out_of_order == 2
+    assert runner.errors == 0
+    assert pool.available == 3
@@ -0,0 +1,51 @@
+import cscore as cs
+
+
+def _source():
+    source = cs.CvSource("props", cs.VideoMode.PixelFormat.kBGR, 160, 120, 30)
+    source.createIntegerProperty("brightness", 0, 100, 1, 50, 50)
+    source.createBooleanProperty("auto", False, False)
+    source.createStringProperty("label", "front")
+    prop = source.createProperty("mode", cs.VideoProperty.Kind.kEnum, 0, 2, 1, 0, 0)
+    source.setEnumPropertyChoices(prop, ["off", "low", "high"])
+    return source
+
+
+def test_get_properties():
+    props = _source().getProperties()
+    assert props["brightness"] == 50
+    assert props["auto"] is False
+    assert props["label"] == "front"
+    assert props["mode"] == 0
+
+
+def test_set_properties():
+    source = _source()
+    result = source.setProperties(
+        {"brightness": 20, "auto": True, "label": "rear", "mode": "high"}
+    )
+    assert result == {"brightness": 0, "auto": 0, "label": 0, "mode": 0}
+
+    props = source.getProperties()
+    assert props["brightness"] == 20
+    assert props["auto"] is True
+    assert props["label"] == "rear"
+    assert props["mode"] == 2
+
+
+def test_set_properties_errors():
+    source = _source()
+    result = source.setProperties({"missing": 1, "label": 3, "mode": "bogus"})
+    assert all(status != 0 for status in result.values())
+    assert set(result) == {"missing", "label", "mode"}
+
+
+def test_apply_snapshot():
+    source = _source()
+    snapshot = source.getProperties()
+    source.setProperties({"brightness": 70})
+
+    snapshot["label"] = "side"
+    result = source.applySnapshot(snapshot)
+    assert result == {"brightness": 0, "label": 0}
+    assert source.getProperties() == snapshot
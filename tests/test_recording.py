@@ -0,0 +1,19 @@
+from cscore.recording import RecordingReader, RecordingWriter
+
+
+def test_recording_roundtrip(tmp_path):
+    writer = RecordingWriter(str(tmp_path), chunk_size=100)
+    for i in range(10):
+        writer.append(float(i), bytes([i]) * 30)
+    writer.close()
+
+    assert len(list(tmp_path.glob("chunk-*.bin"))) > 1
+
+    reader = RecordingReader(str(tmp_path))
+    assert len(reader) == 10
+    assert reader.read(3) == (3.0, bytes([3]) * 30)
+
+    idx = reader.seek(6.5)
+    assert idx == 7
+    assert [t for t, _ in reader.frames(idx)] == [7.0, 8.0, 9.0]
+    assert all(data == bytes([int(t)]) * 30 for t, data in reader)
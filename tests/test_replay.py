@@ -0,0 +1,77 @@
+import time
+
+import numpy as np
+import pytest
+
+import cscore as cs
+from cscore.replay import ReplaySource, _session_images
+
+
+def _write_session(cv2, path):
+    for i in range(5):
+        img = np.full((48, 64, 3), i * 40, dtype=np.uint8)
+        cv2.imwrite(str(path / ("%.2f.png" % (100 + i * 0.01))), img)
+    # a partially written image is skipped
+    (path / "100.025.jpg").write_bytes(b"\xff\xd8\xff")
+
+
+def test_session_images_order(tmp_path):
+    for name in ("10.50.jpg", "9.25.jpg", "11.00.png", "notes.txt", "x.jpg"):
+        (tmp_path / name).write_bytes(b"")
+
+    files = _session_images(str(tmp_path))
+    assert [t for t, _ in files] == [9.25, 10.5, 11.0]
+
+
+def test_replay_session(tmp_path):
+    cv2 = pytest.importorskip("cv2")
+
+    _write_session(cv2, tmp_path)
+
+    source = ReplaySource(str(tmp_path), speed=None, lookahead=2)
+    assert source.getVideoMode().width == 64
+    assert source.getVideoMode().height == 48
+
+    sink = cs.CvSink("replay")
+    sink.setSource(source)
+
+    # nothing is played until started
+    assert not source.wait(0.1)
+    assert source.played == 0
+
+    source.start()
+    assert source.wait(5.0)
+    assert source.played == 5
+    source.stop()
+
+
+def test_replay_lockstep(tmp_path):
+    cv2 = pytest.importorskip("cv2")
+
+    _write_session(cv2, tmp_path)
+
+    source = ReplaySource(
+        str(tmp_path), speed=None, lockstep=True, lockstep_timeout=0.2
+    )
+    sink = cs.CvSink("replay")
+    sink.setSource(source)
+    source.start()
+
+    values = []
+    buf = np.zeros((48, 64, 3), dtype=np.uint8)
+    try:
+        while len(values) < 5:
+            t, buf = sink.grabFrameInto(buf, 1.0)
+            assert t != 0, sink.getError()
+            values.append(int(buf[0, 0, 0]))
+            # take longer than any frame would be played for
+            time.sleep(0.05)
+            source.advance()
+
+        assert source.wait(5.0)
+    finally:
+        source.stop()
+
+    # every frame is received, once
+    assert values == [0, 40, 80, 120, 160]
+    assert source.played == 5
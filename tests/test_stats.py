@@ -0,0 +1,19 @@
+import cscore as cs
+
+from cscore import stats
+
+
+def test_snapshot():
+    source = cs.CvSource("statsrc", cs.VideoMode.PixelFormat.kBGR, 160, 120, 30)
+    sink = cs.CvSink("statsink")
+    sink.setSource(source)
+
+    sources, sinks = stats.snapshot()
+    assert source.getHandle() in sources["handle"]
+
+    row = sinks[sinks["handle"] == sink.getHandle()][0]
+    assert row["name"] == "statsink"
+    assert row["source"] == source.getHandle()
+
+    d = stats.snapshotDict()
+    assert d["sources"]["statsrc"]["handle"] == source.getHandle()
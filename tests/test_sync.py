@@ -0,0 +1,91 @@
+import threading
+import time
+
+import numpy as np
+
+import cscore as cs
+from cscore.sync import FrameSynchronizer
+
+
+def _sync(**kwargs):
+    sinks = [cs.CvSink("sync%d" % i) for i in range(2)]
+    return FrameSynchronizer(sinks, tolerance=0.002, **kwargs)
+
+
+def test_sync_matching():
+    sync = _sync()
+    img = np.zeros((1, 1, 3), dtype=np.uint8)
+    try:
+        with sync._cond:
+            sync._add(0, 1000, img)
+            sync._add(1, 1500, img)
+            # 0 has no partner for 10000
+            sync._add(0, 10000, img)
+            sync._add(1, 20000, img)
+            sync._add(0, 21000, img)
+
+        assert sync.get(0) == ((1000, 1500), (img, img))
+        assert sync.get(0) == ((21000, 20000), (img, img))
+        assert sync.get(0) == (None, None)
+        assert sync.matched == 2
+        assert sync.unmatched == 1
+        assert sync.dropped == 0
+    finally:
+        sync.stop()
+
+
+def test_sync_drops():
+    sync = _sync(depth=2, queue_size=1)
+    img = np.zeros((1, 1, 3), dtype=np.uint8)
+    try:
+        with sync._cond:
+            for t in (1000, 50000, 100000):
+                sync._add(0, t, img)
+            # the first frame was pushed out of the buffer
+            assert sync.dropped == 1
+
+            sync._add(1, 50000, img)
+            sync._add(1, 100000, img)
+
+        # only the newest tuple is kept
+        assert sync.get(0)[0] == (100000, 100000)
+        assert sync.matched == 2
+        assert sync.dropped == 3
+    finally:
+        sync.stop()
+
+
+def test_sync_sources():
+    w, h = 160, 120
+    sources = [
+        cs.CvSource("syncsrc%d" % i, cs.VideoMode.PixelFormat.kBGR, w, h, 30)
+        for i in range(2)
+    ]
+    sinks = []
+    for source in sources:
+        sink = cs.CvSink("sync" + source.getName())
+        sink.setSource(source)
+        sinks.append(sink)
+
+    sync = FrameSynchronizer(sinks, tolerance=0.005)
+    stop = threading.Event()
+
+    def _put():
+        imgs = [np.full((h, w, 3), i, dtype=np.uint8) for i in range(2)]
+        while not stop.is_set():
+            cs.CvSource.putFrames(list(zip(sources, imgs)))
+            time.sleep(0.02)
+
+    th = threading.Thread(target=_put, daemon=True)
+    th.start()
+
+    try:
+        times, images = sync.get(2.0)
+        assert times is not None
+        assert abs(int(times[0]) - int(times[1])) <= 5000
+        assert (images[0] == 0).all() and (images[1] == 1).all()
+        assert not images[0].flags.writeable
+    finally:
+        stop.set()
+        th.join()
+        sync.stop()